@@ -0,0 +1,128 @@
+import json
+import math
+from typing import Dict, Tuple
+from jose import JWTError, jwt
+from .config import settings
+from .logger import get_logger
+from .services.rate_limiter import get_backend, parse_rate
+from . import metrics
+
+logger = get_logger(__name__)
+
+# Routes whose in-flight requests count against MAX_CONCURRENT_ANALYSES
+CONCURRENCY_LIMITED_ROUTES = {"POST /api/analyze"}
+
+
+def _identity(scope) -> str:
+    """JWT `sub` when the request carries a valid token, else the client IP"""
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+                    if payload.get("sub"):
+                        return f"user:{payload['sub']}"
+                except JWTError:
+                    pass
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+async def _reject(send, status: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControlMiddleware:
+    """
+    Sheds load before it reaches the handlers:
+    - token buckets per user (JWT `sub`, or client IP) and per route, from
+      RATE_LIMIT_RULES -> 429 with Retry-After;
+    - a cap on concurrent /api/analyze requests in this worker
+      (MAX_CONCURRENT_ANALYSES) -> 503 with Retry-After.
+    Bucket state lives in the backend from services.rate_limiter. If that
+    backend errors, requests are let through rather than failed.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.rules: Dict[str, Dict[str, Tuple[float, float]]] = {
+            route: {kind: parse_rate(spec) for kind, spec in limits.items()}
+            for route, limits in settings.RATE_LIMIT_RULES.items()
+        }
+        self.in_flight = 0
+        self.counters = {"admitted": 0, "rate_limited": 0, "over_capacity": 0}
+        metrics.collector(self._metrics)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {scope['path'].rstrip('/') or '/'}"
+        rule = self.rules.get(route)
+        limited = route in CONCURRENCY_LIMITED_ROUTES
+
+        # Capacity first: a request turned away with 503 must not spend the
+        # caller's rate-limit tokens. The slot is held while the rate check
+        # awaits, so concurrent requests cannot overshoot the cap.
+        if limited:
+            if self.in_flight >= settings.MAX_CONCURRENT_ANALYSES:
+                self.counters["over_capacity"] += 1
+                logger.info("Request rejected, analysis capacity full", extra={"route": route, "in_flight": self.in_flight})
+                await _reject(send, 503, "Server busy, please retry shortly", 1)
+                return
+            self.in_flight += 1
+        try:
+            if rule:
+                retry_after = await self._check_rate(route, rule, scope)
+                if retry_after is not None:
+                    self.counters["rate_limited"] += 1
+                    logger.info("Request rate limited", extra={"route": route, "retry_after": round(retry_after, 2)})
+                    await _reject(send, 429, "Too many requests", retry_after)
+                    return
+            if rule or limited:
+                self.counters["admitted"] += 1
+            await self.app(scope, receive, send)
+        finally:
+            if limited:
+                self.in_flight -= 1
+
+    async def _check_rate(self, route: str, rule, scope):
+        """Seconds to wait if a limit is exceeded, None if the request may proceed"""
+        backend = get_backend()
+        checks = []
+        if "user" in rule:
+            checks.append((f"{route}|{_identity(scope)}", rule["user"]))
+        if "route" in rule:
+            checks.append((route, rule["route"]))
+        try:
+            for key, (rate, burst) in checks:
+                allowed, retry_after = await backend.take(key, rate, burst)
+                if not allowed:
+                    return retry_after
+        except Exception as e:
+            logger.warning("Rate limit backend failed, admitting request", extra={"error": str(e)})
+        return None
+
+    def _metrics(self):
+        yield metrics.Metric(
+            "admission_requests_total", "counter",
+            "Rate-limited routes: requests admitted or rejected by admission control",
+            [({"outcome": k}, v) for k, v in self.counters.items()],
+        )
+        yield metrics.Metric(
+            "analyses_in_flight", "gauge",
+            "Concurrent /api/analyze requests in this worker",
+            [({}, self.in_flight)],
+        )
@@ -0,0 +1,45 @@
+"""
+Rebuilds the doctor_daily_stats rollups from existing consultations.
+
+    python -m app.cli.backfill_rollups
+    python -m app.cli.backfill_rollups --start 2025-01-01 --end 2025-03-31
+
+Safe to re-run: each doctor-day in the range is replaced, not incremented,
+and rollups for days left without consultations are deleted. Today is never
+rebuilt (its counters are still being incremented live), and --end is
+clamped to yesterday. A follow-up scheduled for a day while that day is being
+rewritten can be lost, so run this off-peak.
+"""
+import argparse
+import asyncio
+from datetime import date
+from ..database import init_db, close_db
+from ..logger import setup_logging, shutdown_logging
+from ..services import analytics_service
+
+
+async def run(args):
+    await init_db()
+    try:
+        written = await analytics_service.backfill(args.start, args.end, args.batch_size)
+        print(f"Rebuilt {written} doctor-day rollups.")
+    finally:
+        await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild dashboard rollups from consultations.")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day to rebuild (YYYY-MM-DD; at most yesterday)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
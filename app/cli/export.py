@@ -0,0 +1,86 @@
+"""
+Bulk export for reporting jobs: consultations or analysis history across
+all users, as NDJSON or CSV, to a file or stdout. The HTTP export endpoints
+only ever return the caller's own records.
+
+    python -m app.cli.export consultations --format csv --output consultations.csv
+    python -m app.cli.export consultations --start 2025-01-01 --end 2025-04-01 --diagnosis Migraine
+    python -m app.cli.export analysis-history --fields user_uid,llm_symptoms > history.ndjson
+
+Dates without a timezone are taken as server local time. Rows stream off
+the cursor in batches, so memory stays flat whatever the size of the export.
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from fastapi import HTTPException
+from ..database import init_db, close_db
+from ..logger import setup_logging, shutdown_logging
+from ..models import AnalysisResult, Consultation
+from ..services import export_service
+
+
+async def run(args) -> int:
+    await init_db()
+    try:
+        query: dict = {}
+        if args.collection == "consultations":
+            model, sort = Consultation, [("consultation_date", 1)]
+            for field, value in (("doctor_email", args.doctor), ("patient_email", args.patient), ("diagnosis", args.diagnosis)):
+                if value:
+                    query[field] = value
+            date_range = export_service.date_range(args.start, args.end)
+            if date_range:
+                query["consultation_date"] = date_range
+        else:
+            model, sort = AnalysisResult, [("_id", 1)]
+            if args.user:
+                query["user_uid"] = args.user
+            id_range = export_service.date_range(args.start, args.end, bound=export_service.object_id_bound)
+            if id_range:
+                query["_id"] = id_range
+
+        fields = export_service.select_fields(model, args.fields)
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        written = 0
+        try:
+            async for chunk in export_service.stream(model, query, sort, fields, args.format, args.batch_size):
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            if args.output:
+                out.close()
+        return written
+    finally:
+        await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export consultations or analysis history across all users.")
+    parser.add_argument("collection", choices=["consultations", "analysis-history"])
+    parser.add_argument("--format", choices=export_service.FORMATS, default="ndjson")
+    parser.add_argument("--output", help="File to write (default stdout)")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="On or after this date/time (ISO 8601)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Before this date/time (ISO 8601)")
+    parser.add_argument("--doctor", help="Consultations: doctor email")
+    parser.add_argument("--patient", help="Consultations: patient email")
+    parser.add_argument("--diagnosis", help="Consultations: exact diagnosis")
+    parser.add_argument("--user", help="Analysis history: username")
+    parser.add_argument("--fields", help="Comma-separated field names; default all")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        written = asyncio.run(run(args))
+    except HTTPException as e:
+        parser.error(e.detail)
+    finally:
+        shutdown_logging()
+    if args.output:
+        print(f"Wrote {written:,} bytes to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Rewrites stored ML predictions into the compact disease-catalog form
+(see services.disease_catalog), or back to the full form with --expand.
+
+    python -m app.cli.migrate_compact --dry-run
+    python -m app.cli.migrate_compact
+    python -m app.cli.migrate_compact --collection consultations --expand
+
+Safe to re-run or interrupt: documents already in the target form are
+skipped, and entries that cannot be compacted without loss stay as they are.
+"""
+import argparse
+import asyncio
+import time
+import bson
+from pymongo import UpdateOne
+from ..database import init_db, close_db, mongo
+from ..logger import setup_logging, shutdown_logging
+from ..services.disease_catalog import catalog
+
+# collection -> predictions field
+COLLECTIONS = {
+    "analysis_history": "ml_results",
+    "consultations": "ml_predictions",
+}
+
+
+def _size(value) -> int:
+    return len(bson.encode({"v": value}))
+
+
+async def migrate(collection_name: str, expand: bool = False, batch_size: int = 500, dry_run: bool = False) -> dict:
+    """Converts one collection; returns counts and the field's total size before and after"""
+    field = COLLECTIONS[collection_name]
+    collection = mongo.db[collection_name]
+    convert = catalog.hydrate if expand else catalog.compact
+    stats = {"collection": collection_name, "scanned": 0, "updated": 0, "bytes_before": 0, "bytes_after": 0}
+
+    cursor = collection.find({field: {"$exists": True}}, {field: 1}).sort("_id", 1).batch_size(batch_size)
+    ops = []
+    async for doc in cursor:
+        before = doc[field]
+        after = convert(before)
+        stats["scanned"] += 1
+        stats["bytes_before"] += _size(before)
+        stats["bytes_after"] += _size(after)
+        if after is before:
+            continue
+        stats["updated"] += 1
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {field: after}}))
+        if len(ops) >= batch_size:
+            if not dry_run:
+                await collection.bulk_write(ops, ordered=False)
+            ops = []
+    if ops and not dry_run:
+        await collection.bulk_write(ops, ordered=False)
+    return stats
+
+
+async def run(args):
+    await init_db()
+    try:
+        for name in args.collection or sorted(COLLECTIONS):
+            started = time.perf_counter()
+            stats = await migrate(name, args.expand, args.batch_size, args.dry_run)
+            before, after = stats["bytes_before"], stats["bytes_after"]
+            saved = 100 * (1 - after / before) if before else 0.0
+            verb = "Would update" if args.dry_run else "Updated"
+            print(f"{name}: {verb} {stats['updated']} of {stats['scanned']} documents in "
+                  f"{time.perf_counter() - started:.1f}s; predictions {before:,} -> {after:,} bytes ({saved:.0f}% smaller).")
+    finally:
+        await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert stored ML predictions to or from the compact form.")
+    parser.add_argument("--collection", action="append", choices=sorted(COLLECTIONS),
+                        help="Collection to convert (repeatable; default both)")
+    parser.add_argument("--expand", action="store_true", help="Write the full form back (rollback)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
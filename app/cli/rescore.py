@@ -0,0 +1,297 @@
+"""
+Re-scores stored transcriptions with the current symptom extractor and model,
+e.g. after retraining or a vocabulary change.
+
+    python -m app.cli.rescore --collection analysis_history
+    python -m app.cli.rescore --collection consultations --output rescored.jsonl
+    python -m app.cli.rescore --input dump.jsonl --output rescored.jsonl --workers 8
+
+Records are read in batches (Mongo in _id order, or a JSONL file), scored in
+a process pool where each worker loads the model once, and written back with
+bulk updates or appended to --output. After every batch that is written, the
+position is saved to --checkpoint, so an interrupted run picks up where it
+stopped. Re-running with --restart ignores the checkpoint.
+
+Only the extracted symptoms and ML predictions are replaced. A consultation's
+diagnosis is left as the doctor saw it. Records whose transcription is empty or
+names no known symptom are skipped (and counted) rather than overwritten with
+the API's default symptoms. Run app.cli.backfill_rollups afterwards
+so the dashboard counters pick up the new symptoms.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import UpdateOne
+from ..database import init_db, close_db, mongo
+from ..logger import get_logger, setup_logging, shutdown_logging
+from ..responses import dumps
+from ..services.disease_catalog import catalog
+
+logger = get_logger(__name__)
+
+# collection -> (transcription field, symptoms field, predictions field)
+COLLECTIONS = {
+    "analysis_history": ("raw_transcription", "llm_symptoms", "ml_results"),
+    "consultations": ("transcription", "symptoms", "ml_predictions"),
+}
+# Accepted transcription keys in JSONL input, first match wins
+JSONL_TEXT_FIELDS = ("raw_transcription", "transcription", "text")
+JSONL_CHUNK_BYTES = 1 << 20
+
+Record = Tuple[object, str]  # (_id or line number, transcription)
+
+
+# --- Worker side (runs in the pool processes) ---
+def _init_worker():
+    from ..services.auditor_service import auditor
+    auditor.load_model()
+
+
+def _score(batch: List[Record]) -> Tuple[List[Tuple[object, List[str], dict]], int, object]:
+    """(scored records, records skipped, key of the batch's last record)"""
+    from ..services.auditor_service import auditor
+    from ..services.llm_service import match_symptoms
+    if auditor.model is None:
+        # Writing empty predictions over the stored ones would lose data
+        raise RuntimeError("Model not loaded in worker; is models/ExtraTrees.pkl present?")
+    # No fallback symptoms here: a record with nothing to score keeps what it has
+    matched = [(key, match_symptoms(text or "")) for key, text in batch]
+    matched = [(key, symptoms) for key, symptoms in matched if symptoms]
+    results = auditor.predict_batch([symptoms for _, symptoms in matched]) if matched else []
+    scored = [
+        (key, symptoms, result.model_dump())
+        for (key, symptoms), result in zip(matched, results)
+    ]
+    return scored, len(batch) - len(scored), batch[-1][0]
+
+
+# --- Sources ---
+async def _mongo_batches(collection, text_field: str, after, batch_size: int, limit: Optional[int]) -> AsyncIterator[List[Record]]:
+    query = {"_id": {"$gt": after}} if after is not None else {}
+    cursor = collection.find(query, {text_field: 1}).sort("_id", 1).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+    batch: List[Record] = []
+    async for doc in cursor:
+        batch.append((doc["_id"], doc.get(text_field) or ""))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _jsonl_batches(path: str, after: Optional[int], batch_size: int, limit: Optional[int]) -> AsyncIterator[List[Record]]:
+    """Keys are 1-based line numbers; the checkpoint is the last line written"""
+    batch: List[Record] = []
+    taken = 0
+    line_no = 0
+    with open(path, encoding="utf-8") as f:
+        while True:
+            # File reads happen in a thread, a chunk at a time, off the event loop
+            lines = await asyncio.to_thread(f.readlines, JSONL_CHUNK_BYTES)
+            if not lines:
+                break
+            for line in lines:
+                line_no += 1
+                if (after is not None and line_no <= after) or not line.strip():
+                    continue
+                record = json.loads(line)
+                text = next((record[k] for k in JSONL_TEXT_FIELDS if record.get(k)), "")
+                batch.append((line_no, text))
+                taken += 1
+                if len(batch) == batch_size or taken == limit:
+                    yield batch
+                    batch = []
+                if taken == limit:
+                    return
+    if batch:
+        yield batch
+
+
+# --- Sinks ---
+class MongoSink:
+    def __init__(self, collection, symptoms_field: str, predictions_field: str):
+        self.collection = collection
+        self.symptoms_field = symptoms_field
+        self.predictions_field = predictions_field
+
+    async def write(self, scored):
+        ops = [
+            UpdateOne({"_id": key}, {"$set": {self.symptoms_field: symptoms, self.predictions_field: catalog.compact(predictions)}})
+            for key, symptoms, predictions in scored
+        ]
+        await self.collection.bulk_write(ops, ordered=False)
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """Appends one JSON line per record: {"_id" | "line", "symptoms", "predictions"}"""
+    def __init__(self, path: str, key_name: str, append: bool):
+        self.key_name = key_name
+        self.f = open(path, "ab" if append else "wb")
+
+    async def write(self, scored):
+        self.f.write(b"".join(
+            dumps({self.key_name: key, "symptoms": symptoms, "predictions": predictions}) + b"\n"
+            for key, symptoms, predictions in scored
+        ))
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+# --- Checkpoints ---
+def _load_checkpoint(path: str, source: str):
+    if not os.path.exists(path):
+        return None, 0
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("source") != source:
+        raise SystemExit(f"Checkpoint {path} belongs to {state.get('source')}, not {source}; use --restart or another --checkpoint")
+    position = state["position"]
+    return (ObjectId(position) if state.get("position_type") == "objectid" else position), state["processed"]
+
+
+def _save_checkpoint(path: str, source: str, position, processed: int):
+    state = {
+        "source": source,
+        "position": str(position) if isinstance(position, ObjectId) else position,
+        "position_type": "objectid" if isinstance(position, ObjectId) else "line",
+        "processed": processed,
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    # Write-then-rename so a crash never leaves a half-written checkpoint
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+# --- Driver ---
+async def _pipeline(batches: AsyncIterator[List[Record]], sink, pool: ProcessPoolExecutor, workers: int, checkpoint: str, source: str, processed: int) -> Tuple[int, int, int, Optional[float]]:
+    """
+    Keeps up to 2 batches per worker in flight and writes results in
+    submission order, so the checkpoint always marks a contiguous prefix.
+    Returns (records written, records skipped, batches, perf_counter of the
+    first scored batch).
+    """
+    loop = asyncio.get_running_loop()
+    in_flight: deque = deque()
+    done = 0
+    skipped = 0
+    batch_count = 0
+    first_scored = None
+
+    async def drain_one():
+        nonlocal done, skipped, processed, batch_count, first_scored
+        scored, batch_skipped, last_key = await in_flight.popleft()
+        first_scored = first_scored or time.perf_counter()
+        if scored:
+            await sink.write(scored)
+        done += len(scored)
+        skipped += batch_skipped
+        processed += len(scored) + batch_skipped
+        batch_count += 1
+        _save_checkpoint(checkpoint, source, last_key, processed)
+        if batch_count % 10 == 0:
+            logger.info("Rescore progress", extra={"records": done, "skipped": skipped, "batches": batch_count})
+
+    async for batch in batches:
+        in_flight.append(loop.run_in_executor(pool, _score, batch))
+        if len(in_flight) >= workers * 2:
+            await drain_one()
+    while in_flight:
+        await drain_one()
+    return done, skipped, batch_count, first_scored
+
+
+async def run(args):
+    use_mongo = args.input is None
+    source = f"mongo:{args.collection}" if use_mongo else f"jsonl:{os.path.abspath(args.input)}"
+    checkpoint = args.checkpoint or f"rescore-{args.collection if use_mongo else os.path.basename(args.input)}.checkpoint.json"
+
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    after, processed = _load_checkpoint(checkpoint, source)
+    if after is not None:
+        logger.info("Resuming from checkpoint", extra={"checkpoint": checkpoint, "position": str(after), "processed": processed})
+
+    if use_mongo:
+        await init_db()
+    try:
+        text_field, symptoms_field, predictions_field = COLLECTIONS[args.collection]
+        if use_mongo:
+            collection = mongo.db[args.collection]
+            batches = _mongo_batches(collection, text_field, after, args.batch_size, args.limit)
+        else:
+            batches = _jsonl_batches(args.input, after, args.batch_size, args.limit)
+
+        if args.output:
+            sink = FileSink(args.output, "_id" if use_mongo else "line", append=after is not None)
+        else:
+            sink = MongoSink(collection, symptoms_field, predictions_field)
+
+        # spawn: workers start clean instead of inheriting the parent's Motor
+        # client, event loop and logging threads
+        context = multiprocessing.get_context("spawn")
+        started = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(max_workers=args.workers, mp_context=context, initializer=_init_worker) as pool:
+                done, skipped, batch_count, first_scored = await _pipeline(batches, sink, pool, args.workers, checkpoint, source, processed)
+        finally:
+            sink.close()
+        elapsed = time.perf_counter() - started
+    finally:
+        if use_mongo:
+            await close_db()
+
+    rate = done / elapsed if elapsed else 0.0
+    print(f"Rescored {done} records in {batch_count} batches over {elapsed:.1f}s "
+          f"({rate:.1f} records/s, {args.workers} workers, batch size {args.batch_size}).")
+    if skipped:
+        print(f"Skipped {skipped} records with an empty transcription or no recognised symptoms (left unchanged).")
+    if first_scored:
+        # Spawning workers and loading the model dominates short runs
+        print(f"First batch scored after {first_scored - started:.1f}s (worker startup and model load).")
+    print(f"Checkpoint: {checkpoint}")
+    logger.info("Rescore finished", extra={
+        "source": source, "records": done, "skipped": skipped, "batches": batch_count,
+        "elapsed_s": round(elapsed, 2), "records_per_s": round(rate, 1),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored transcriptions with the current model.")
+    parser.add_argument("--collection", choices=sorted(COLLECTIONS), default="analysis_history",
+                        help="Collection to read (and update when --output is not given)")
+    parser.add_argument("--input", help="Read a JSONL dump instead of Mongo")
+    parser.add_argument("--output", help="Write results to this JSONL file instead of updating Mongo")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--limit", type=int, help="Stop after this many records")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: rescore-<source>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    args = parser.parse_args()
+    if args.input and not args.output:
+        parser.error("--input requires --output")
+
+    setup_logging()
+    try:
+        asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
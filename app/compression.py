@@ -0,0 +1,137 @@
+import zlib
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+_COMPRESSIBLE_TYPES = (b"application/json", b"application/x-ndjson", b"text/")
+
+
+def _accepted_codings(accept: bytes) -> dict:
+    """Accept-Encoding -> {coding: q}; a missing q is 1, a malformed one 0"""
+    weights = {}
+    for item in accept.split(b","):
+        coding, *params = [part.strip() for part in item.split(b";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition(b"=")
+            if name.strip() == b"q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def _choose_encoding(scope):
+    accept = b""
+    for name, value in scope.get("headers", []):
+        if name == b"accept-encoding":
+            accept = value.lower()
+            break
+    weights = _accepted_codings(accept)
+    wildcard = weights.get(b"*", 0.0)
+    candidates = ([b"br"] if brotli is not None else []) + [b"gzip"]
+    # Highest q wins; on a tie the earlier (better) candidate; q=0 means "not acceptable"
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best.decode() if best else None
+
+
+def _with_vary(headers: list) -> list:
+    """Adds Accept-Encoding to Vary unless it (or "*") is already listed"""
+    for i, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            listed = {v.strip().lower() for v in value.split(b",")}
+            if b"accept-encoding" in listed or b"*" in listed:
+                return headers
+            headers = list(headers)
+            headers[i] = (name, value + b", Accept-Encoding")
+            return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self.compress, self.finish = self._c.process, self._c.finish
+            self.flush = self._c.flush
+        else:
+            # wbits=31 -> gzip container
+            self._c = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self.compress, self.finish = self._c.compress, self._c.flush
+            self.flush = lambda: self._c.flush(zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    Negotiates brotli (when installed) or gzip for JSON/NDJSON/text bodies
+    of at least COMPRESSION_MIN_SIZE bytes. Streaming responses are
+    compressed chunk by chunk, so they stay incremental.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        encoding = _choose_encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+
+            if compressor is None:
+                headers = dict(start.get("headers", []))
+                content_type = headers.get(b"content-type", b"")
+                eligible = (
+                    b"content-encoding" not in headers
+                    and content_type.startswith(_COMPRESSIBLE_TYPES)
+                    and (more or len(body) >= settings.COMPRESSION_MIN_SIZE)
+                )
+                if not eligible:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                new_headers = [(k, v) for k, v in start.get("headers", []) if k != b"content-length"]
+                new_headers = _with_vary(new_headers) + [(b"content-encoding", encoding.encode())]
+                if not more:
+                    payload = compressor.compress(body) + compressor.finish()
+                    new_headers.append((b"content-length", str(len(payload)).encode()))
+                    await send({**start, "headers": new_headers})
+                    await send({"type": "http.response.body", "body": payload})
+                    return
+                await send({**start, "headers": new_headers})
+
+            # Flush each streamed chunk so clients see rows as they are produced
+            chunk = compressor.compress(body) + (compressor.flush() if more else compressor.finish())
+            await send({"type": "http.response.body", "body": chunk, "more_body": more})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,3 +1,4 @@
+from typing import Dict
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,6 +10,68 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # MongoDB client
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 5
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_SOCKET_TIMEOUT_MS: int = 20000
+    MONGO_COMPRESSORS: str = "zstd,snappy,zlib"        # Preference order; unavailable ones are skipped
+    MONGO_HISTORY_READ_PREFERENCE: str = "primary"     # e.g. "secondaryPreferred" on a replica set
+
+    # Upstream timeouts (seconds) and what counts as a slow call
+    GROQ_TIMEOUT_SECONDS: float = 15.0
+    GROQ_SLOW_CALL_SECONDS: float = 8.0
+    STT_TIMEOUT_SECONDS: float = 45.0
+    STT_SLOW_CALL_SECONDS: float = 20.0
+    UPSTREAM_MAX_THREADS: int = 16        # Threads for blocking Groq/STT calls, shared by both
+
+    # Circuit breakers (shared settings for every upstream)
+    CIRCUIT_WINDOW_SECONDS: float = 60.0
+    CIRCUIT_MIN_CALLS: int = 5
+    CIRCUIT_FAILURE_RATE: float = 0.5
+    CIRCUIT_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_OPEN_SECONDS: float = 30.0
+    CIRCUIT_HALF_OPEN_PROBES: int = 1
+
+    # Admission control. Rules map "METHOD /path" to token buckets "N/period"
+    # per user ("user") and for the whole route ("route"); JSON in the env.
+    # Requests without a JWT are keyed by client IP, which behind a load
+    # balancer is the balancer's unless uvicorn runs with --proxy-headers
+    # and --forwarded-allow-ips; so unauthenticated routes (e.g. login) have
+    # no default rule.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"    # "memory" (per worker) or "mongo" (shared by workers)
+    RATE_LIMIT_RULES: Dict[str, Dict[str, str]] = {
+        "POST /api/analyze": {"user": "10/minute", "route": "300/minute"},
+    }
+    MAX_CONCURRENT_ANALYSES: int = 16
+
+    # Idempotency-Key on POST /api/analyze
+    IDEMPOTENCY_TTL_SECONDS: int = 86400      # How long a stored response can be replayed
+    IDEMPOTENCY_LEASE_SECONDS: int = 180      # In-progress runs older than this are taken over
+    IDEMPOTENCY_WAIT_SECONDS: float = 60      # Max time a duplicate waits for the first run
+
+    # Doctor patient roster cache (per worker; cleared on patient signup)
+    ROSTER_CACHE_SECONDS: float = 30
+    ROSTER_CACHE_MAX_ENTRIES: int = 1000
+
+    # Response compression (brotli when installed, else gzip)
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 5
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Prescriptions: "llm" asks Groq first and falls back to the rule table;
+    # "rules" serves the rule table and asks Groq only for diseases with no rule
+    PRESCRIPTION_MODE: str = "llm"
+    PRESCRIPTION_RULES_PATH: str = "data/prescription_rules.json"
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"              # "json" or "text"
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0    # Fraction of requests whose DEBUG stage logs are kept
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -1,10 +1,154 @@
+import importlib.util
+from functools import lru_cache
+from typing import List, Optional, Type
 import motor.motor_asyncio
-from beanie import init_beanie
+from beanie import Document, init_beanie
+from pymongo import ReadPreference
 from .config import settings
-from .models import User, AnalysisResult # Make sure User is here
+from .models import User, AnalysisResult, Consultation, DoctorDailyStats, IdempotencyRecord # Make sure User is here
+from .logger import get_logger
+from .services.disease_catalog import catalog
+
+logger = get_logger(__name__)
+
+# Every Beanie document the app reads or writes must be registered here
+DOCUMENT_MODELS = [User, AnalysisResult, Consultation, DoctorDailyStats, IdempotencyRecord]
+
+# Wire compressors and the module pymongo needs for each of them
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def _available_compressors() -> str:
+    """Keeps the configured compressors whose library is installed (pymongo only warns otherwise)."""
+    wanted = [c.strip() for c in settings.MONGO_COMPRESSORS.split(",") if c.strip()]
+    usable = [c for c in wanted if c in _COMPRESSOR_MODULES and importlib.util.find_spec(_COMPRESSOR_MODULES[c])]
+    skipped = sorted(set(wanted) - set(usable))
+    if skipped:
+        logger.warning("Mongo wire compressors unavailable, skipping", extra={"compressors": skipped})
+    return ",".join(usable)
+
+
+class MongoManager:
+    """
+    Owns the single Motor client for the process. Created and closed by the
+    FastAPI lifespan; everything else reaches Mongo through Beanie or through
+    `read_collection` below.
+    """
+    client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
+    db = None
+
+    async def connect(self, client=None):
+        """Opens the pool and initialises Beanie. `client` lets tools inject their own."""
+        # Fail at startup on a typo rather than silently reading from primary
+        if settings.MONGO_HISTORY_READ_PREFERENCE not in _READ_PREFERENCES:
+            raise ValueError(
+                f"Unknown MONGO_HISTORY_READ_PREFERENCE {settings.MONGO_HISTORY_READ_PREFERENCE!r}; "
+                f"expected one of {', '.join(_READ_PREFERENCES)}"
+            )
+        if client is None:
+            options = dict(
+                maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+                serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+                socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+                appname="symptom-storyteller-api",
+            )
+            compressors = _available_compressors()
+            if compressors:
+                options["compressors"] = compressors
+            client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI, **options)
+
+        self.client = client
+        self.db = client.get_database()
+        await init_beanie(database=self.db, document_models=DOCUMENT_MODELS)
+        logger.info("Database connection initialized...", extra={"database": self.db.name})
+
+    async def close(self):
+        if self.client is not None:
+            self.client.close()
+            logger.info("Database connection closed.")
+        self.client = None
+        self.db = None
+
+    async def ping(self) -> bool:
+        if self.client is None:
+            return False
+        try:
+            await self.client.admin.command("ping")
+            return True
+        except Exception as e:
+            logger.warning("Database ping failed", extra={"error": str(e)})
+            return False
+
+    def read_collection(self, model: Type[Document]):
+        """
+        Collection handle for read-heavy history endpoints. Follows
+        MONGO_HISTORY_READ_PREFERENCE (e.g. "secondaryPreferred") so those
+        reads can be served by secondaries; everything else stays on primary.
+        """
+        collection = model.get_motor_collection()
+        read_preference = _READ_PREFERENCES[settings.MONGO_HISTORY_READ_PREFERENCE]
+        if read_preference == ReadPreference.PRIMARY:
+            return collection
+        return collection.with_options(read_preference=read_preference)
+
+    async def read_documents(self, model: Type[Document], query: dict, sort: Optional[list] = None, limit: int = 0) -> List[dict]:
+        """
+        Raw history read for trusted data we wrote ourselves: projects the
+        model's fields server-side and fills in defaults for missing ones,
+        but skips building and re-validating a Pydantic object per document.
+        Pair with responses.FastJSONResponse.
+        """
+        projection, defaults = _model_shape(model)
+        cursor = self.read_collection(model).find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        compact_fields = getattr(model, "compact_fields", ())
+        docs = []
+        async for doc in cursor:
+            for field, default in defaults:
+                if field not in doc:
+                    doc[field] = default()
+            for field in compact_fields:
+                if field in doc:
+                    doc[field] = catalog.hydrate(doc[field])
+            docs.append(doc)
+        return docs
+
+
+@lru_cache(maxsize=None)
+def _model_shape(model: Type[Document]):
+    """Projection of a document model's stored fields plus its default factories"""
+    projection, defaults = {}, []
+    for name, field in model.model_fields.items():
+        if field.exclude:
+            continue
+        key = field.alias or name
+        projection[key] = 1
+        if key != "_id" and not field.is_required():
+            defaults.append((key, lambda f=field: f.get_default(call_default_factory=True)))
+    return projection, tuple(defaults)
+
+
+_READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+mongo = MongoManager()
+
 
 async def init_db():
-    client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI)
-    db = client.get_database() 
-    await init_beanie(database=db, document_models=[User, AnalysisResult])
-    print("Database connection initialized...")
\ No newline at end of file
+    await mongo.connect()
+
+
+async def close_db():
+    await mongo.close()
@@ -0,0 +1,167 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from .config import settings
+
+# Correlation ID of the request being handled (set by RequestContextMiddleware)
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+# Whether DEBUG stage logs are kept for the current request
+debug_sampled_var: ContextVar[Optional[bool]] = ContextVar("debug_sampled", default=None)
+
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Stamps each record with the request ID and applies DEBUG sampling.
+    Runs in the calling thread, before the record crosses the queue.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        if record.levelno > logging.DEBUG:
+            return True
+        sampled = debug_sampled_var.get()
+        if sampled is None:
+            return random.random() < settings.LOG_DEBUG_SAMPLE_RATE
+        return sampled
+
+
+class _ContextQueueHandler(QueueHandler):
+    """
+    QueueHandler.prepare() folds the traceback into `msg` and drops
+    `exc_info`. Keep the message clean and carry the formatted traceback in
+    `exc_text` instead, so the formatters can put it in its own field.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        # Anything passed through `extra=` becomes a top-level field
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = {k: v for k, v in record.__dict__.items() if k not in _RESERVED_ATTRS and not k.startswith("_")}
+        if extras:
+            line += " " + " ".join(f"{k}={v}" for k, v in extras.items())
+        return line
+
+
+def setup_logging():
+    """
+    Routes the `app` logger through a queue so request handlers never block
+    on stdout; a background QueueListener thread does the actual writes.
+    Safe to call more than once.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    _queue_handler = _ContextQueueHandler(log_queue)
+    _queue_handler.addFilter(RequestContextFilter())
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(settings.LOG_LEVEL.upper())
+    app_logger.addHandler(_queue_handler)
+    app_logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flushes queued records and stops the writer thread."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger("app").removeHandler(_queue_handler)
+    _listener = None
+    _queue_handler = None
+
+
+atexit.register(shutdown_logging)
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+
+class RequestContextMiddleware:
+    """
+    Assigns every HTTP request a correlation ID (taken from X-Request-ID when
+    the client sends one) and makes the DEBUG sampling decision once per
+    request, so a sampled request keeps all of its stage logs.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        id_token = request_id_var.set(request_id)
+        sample_token = debug_sampled_var.set(random.random() < settings.LOG_DEBUG_SAMPLE_RATE)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(id_token)
+            debug_sampled_var.reset(sample_token)
@@ -1,23 +1,47 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from .database import init_db
+from .database import init_db, close_db
+from . import metrics
+from .logger import setup_logging, shutdown_logging, get_logger, RequestContextMiddleware
+from .admission import AdmissionControlMiddleware
+from .compression import CompressionMiddleware
 from .services.auditor_service import auditor # Your ML model service
+from .services.prescription_rules import rule_engine
+from .services import roster_service
 from .routers import analysis_router, auth_router # Your API endpoints
 from .routers import patient_router, doctor_router  # NEW
+from .routers import health_router, export_router, search_router
+
+logger = get_logger(__name__)
+
 # This "lifespan" function is CRITICAL
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # This code runs ONCE when the app starts
-    print("FastAPI: Startup event triggered.")
+    setup_logging()
+    logger.info("FastAPI: Startup event triggered.")
     await init_db()             # Connect to MongoDB
+    await roster_service.backfill_search_fields()  # Users from before the roster search fields
     auditor.load_model()        # Load ML model into memory
-    print("FastAPI: Model loaded, DB connected. App is ready.")
+    rule_engine.load()          # Compile prescription rules
+    logger.info("FastAPI: Model loaded, DB connected. App is ready.")
     yield
-    print("FastAPI: Shutting down.")
+    logger.info("FastAPI: Shutting down.")
+    await close_db()
+    shutdown_logging()
 
 app = FastAPI(title="Symptom Storyteller API", lifespan=lifespan)
 
+# gzip/brotli for large JSON bodies
+app.add_middleware(CompressionMiddleware)
+
+# Rate limits and the analysis concurrency cap. Added before CORS and the
+# request ID so it runs inside both and rejections still carry them; it sits
+# outside compression, which has nothing to do for its short error bodies.
+app.add_middleware(AdmissionControlMiddleware)
+
 # This is CRITICAL for your React app to talk to this backend
 app.add_middleware(
     CORSMiddleware,
@@ -25,14 +49,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "Retry-After", "Idempotent-Replayed"],
 )
 
+# Tags every request with a correlation ID for the logs
+app.add_middleware(RequestContextMiddleware)
+
 # Include your API endpoints
 app.include_router(auth_router.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(analysis_router.router, prefix="/api", tags=["Analysis"])
 app.include_router(patient_router.router, prefix="/api/patient", tags=["patient"])  # NEW
 app.include_router(doctor_router.router, prefix="/api/doctor", tags=["doctor"])    # NEW
+app.include_router(export_router.router, prefix="/api/export", tags=["export"])
+app.include_router(search_router.router, prefix="/api/consultations", tags=["search"])
+app.include_router(health_router.router, prefix="/health", tags=["health"])
 
 @app.get("/")
 def read_root():
-    return {"message": "Symptom Storyteller API is running!"}
\ No newline at end of file
+    return {"message": "Symptom Storyteller API is running!"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """Prometheus scrape endpoint"""
+    return metrics.render()
@@ -0,0 +1,41 @@
+"""
+Minimal Prometheus text exposition. Subsystems register a collector that
+yields their current values when /metrics is scraped, so nothing is kept
+here and there is no extra dependency.
+"""
+from typing import Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+
+class Metric(NamedTuple):
+    name: str
+    type: str                                       # "gauge" or "counter"
+    help: str
+    samples: List[Tuple[Dict[str, str], float]]     # (labels, value)
+
+
+_collectors: List[Callable[[], Iterable[Metric]]] = []
+
+
+def collector(fn: Callable[[], Iterable[Metric]]):
+    """Decorator registering a function that yields Metric tuples"""
+    _collectors.append(fn)
+    return fn
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def render() -> str:
+    lines = []
+    for fn in _collectors:
+        for metric in fn():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for labels, value in metric.samples:
+                lines.append(f"{metric.name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, field_validator, model_validator
 from datetime import datetime
 from beanie import Document
-from typing import List, Optional, Literal # <-- Add Literal
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
+from typing import ClassVar, Dict, List, Optional, Literal, Tuple # <-- Add Literal
+from .services.disease_catalog import catalog
 
 # --- NEW: Token models for auth ---
 class Token(BaseModel):
@@ -23,9 +25,25 @@ class UserCreate(UserBase):
 # --- MODIFIED: User model for DB ---
 class User(Document, UserBase):
     hashed_password: str
+    # Lowercased copies for the roster's case-insensitive prefix search;
+    # always derived from username/email, never returned by the API
+    # (roster_service.backfill_search_fields fills old users at startup)
+    username_lower: Optional[str] = Field(None, exclude=True)
+    email_lower: Optional[str] = Field(None, exclude=True)
+
+    @model_validator(mode="after")
+    def _fill_search_fields(self):
+        self.username_lower = self.username.lower()
+        self.email_lower = self.email.lower() if self.email else None
+        return self
     
     class Settings:
         name = "users" # MongoDB collection name
+        # Doctor roster: ordered pages and prefix search by name or email
+        indexes = [
+            IndexModel([("role", ASCENDING), ("username_lower", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("role", ASCENDING), ("email_lower", ASCENDING)]),
+        ]
 
 # --- ML & Analysis Models (Unchanged) ---
 class Prediction(BaseModel):
@@ -37,15 +55,27 @@ class Prediction(BaseModel):
 class AuditorResponse(BaseModel):
     predictions: List[Prediction]
 
+class StoredPredictions(dict):
+    """A predictions payload that is written in compact form (services.disease_catalog)"""
+
 class AnalysisResult(Document):
     user_uid: str = Field(..., index=True) # This will now be the username
     raw_transcription: str
     llm_symptoms: List[str]
     ml_results: AuditorResponse
     llm_final_summary: str
+
+    # Stored compact; raw reads must hydrate these (see database.read_documents)
+    compact_fields: ClassVar[Tuple[str, ...]] = ("ml_results",)
+
+    @field_validator("ml_results", mode="before")
+    @classmethod
+    def _hydrate_ml_results(cls, value):
+        return catalog.hydrate(value)
     
     class Settings:
         name = "analysis_history"
+        bson_encoders = {AuditorResponse: catalog.compact}
 
 class AnalysisRequest(BaseModel):
     text: str = Field(..., description="Input text")
@@ -75,6 +105,73 @@ class Consultation(Document):
     
     consultation_date: datetime = Field(default_factory=datetime.now)
     status: str = "completed"
+
+    # Stored compact; raw reads must hydrate these (see database.read_documents)
+    compact_fields: ClassVar[Tuple[str, ...]] = ("ml_predictions",)
+
+    @field_validator("ml_predictions")
+    @classmethod
+    def _hydrate_ml_predictions(cls, value):
+        return StoredPredictions(catalog.hydrate(value))
     
     class Settings:
         name = "consultations"
+        bson_encoders = {StoredPredictions: catalog.compact}
+        # Per-owner history in date order (my-consultations, exports)
+        indexes = [
+            IndexModel([("doctor_email", ASCENDING), ("consultation_date", DESCENDING)]),
+            IndexModel([("patient_email", ASCENDING), ("consultation_date", DESCENDING)]),
+            # Roster visit counts per (doctor, patient); also doctor exports filtered by patient
+            IndexModel([("doctor_email", ASCENDING), ("patient_email", ASCENDING), ("consultation_date", DESCENDING)]),
+            # Symptom search (multikey on the symptoms array), scoped per doctor
+            IndexModel([("doctor_email", ASCENDING), ("symptoms", ASCENDING), ("consultation_date", DESCENDING)]),
+            # Free-text search; a collection can only have one text index
+            IndexModel(
+                [("diagnosis", TEXT), ("summary", TEXT), ("transcription", TEXT)],
+                weights={"diagnosis": 10, "summary": 3, "transcription": 1},
+                name="consultation_text",
+            ),
+        ]
+
+# ========== Dashboard rollups ==========
+class DoctorDailyStats(Document):
+    """
+    Pre-aggregated counters per doctor per day, maintained with $inc upserts
+    by services.analytics_service (and rebuilt by app.cli.backfill_rollups).
+    Map keys are escaped, see analytics_service.escape_key.
+    """
+    doctor_email: str
+    day: str                                  # YYYY-MM-DD of consultation_date
+    consultations: int = 0
+    followups: int = 0                        # consultations that got a follow-up scheduled
+    diagnoses: Dict[str, int] = {}
+    symptoms: Dict[str, int] = {}
+
+    class Settings:
+        name = "doctor_daily_stats"
+        indexes = [
+            IndexModel([("doctor_email", ASCENDING), ("day", ASCENDING)], unique=True),
+        ]
+
+# ========== Idempotency keys ==========
+class IdempotencyRecord(Document):
+    """
+    One per (user, Idempotency-Key) on POST /api/analyze. Holds the response
+    once the first request finishes; see services.idempotency_service.
+    """
+    user: str
+    key: str
+    status: Literal["in_progress", "completed"] = "in_progress"
+    token: str                                # owner of the in-progress run
+    request_hash: Optional[str] = None        # request_fingerprint() of the first request
+    lease_until: datetime                     # owner presumed dead after this
+    response: Optional[dict] = None
+    created_at: datetime
+    expires_at: datetime                      # removed by the TTL index
+
+    class Settings:
+        name = "idempotency_keys"
+        indexes = [
+            IndexModel([("user", ASCENDING), ("key", ASCENDING)], unique=True),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
@@ -0,0 +1,29 @@
+import orjson
+from bson import Decimal128, ObjectId
+from fastapi.responses import Response
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content) -> bytes:
+    """orjson with the BSON types Motor hands back (ObjectId, Decimal128)"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for raw Motor documents. Returning it from a route skips
+    FastAPI's response_model validation and the stdlib json encoder; the
+    output matches what the Beanie model would have produced (`_id` as a
+    string, naive ISO datetimes).
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,29 +1,61 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Body
+from fastapi import APIRouter, Depends, File, UploadFile, Body, Header, Response
 from ..models import User, AnalysisResult, Consultation 
 from ..auth import get_current_user
-from ..services import stt_service, llm_service
+from ..database import mongo
+from ..responses import FastJSONResponse
+from ..services import stt_service, llm_service, analytics_service, idempotency_service
 from ..services.auditor_service import auditor
+from ..services.circuit_breaker import CircuitOpenError
+from ..logger import get_logger
 from typing import List, Optional
 import os
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 @router.post("/analyze")
 async def analyze_symptoms(
+    response: Response,
     audio_file: Optional[UploadFile] = File(None),
     text: Optional[str] = Body(None),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: User = Depends(get_current_user)
 ):
-    """Analyze symptoms from audio or text with ML + LLM hybrid approach"""
+    """
+    Analyze symptoms from audio or text with ML + LLM hybrid approach.
+    With an Idempotency-Key header, retries of the same submission return
+    the first response (Idempotent-Replayed: true) instead of re-running;
+    reusing a key for a different text or audio file is a 422.
+    """
+    if not idempotency_key:
+        return await run_analysis(audio_file, text, current_user)
+
+    audio_bytes = None
+    if audio_file:
+        audio_bytes = await audio_file.read()
+        await audio_file.seek(0)
+    result, replayed = await idempotency_service.run_once(
+        current_user.username,
+        idempotency_key,
+        idempotency_service.request_fingerprint(text, audio_bytes),
+        lambda: run_analysis(audio_file, text, current_user),
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+async def run_analysis(audio_file: Optional[UploadFile], text: Optional[str], current_user: User) -> dict:
+    """The full pipeline: STT, symptom extraction, ML/LLM prediction, prescription, storage"""
     
     # --- 1. Get transcription ---
     if audio_file:
         try:
             audio_bytes = await audio_file.read()
             raw_text = await stt_service.transcribe_audio(audio_bytes)
-            print(f"Transcribed: {raw_text}")
+            logger.debug("Transcribed audio", extra={"transcription": raw_text})
         except Exception as e:
-            print(f"STT Error: {e}")
+            logger.warning("STT failed, using fallback transcription", extra={"error": str(e)})
             raw_text = "I have headache and fever"
     elif text:
         raw_text = text
@@ -34,7 +66,7 @@ async def analyze_symptoms(
     symptom_list = llm_service.extract_symptoms_from_text(raw_text)
     if not symptom_list:
         symptom_list = ['headache', 'fatigue']
-        print(f"Using fallback symptoms")
+        logger.info("No symptoms extracted, using fallback symptoms")
 
     # --- 3. Try ML Prediction ---
     ml_results = None
@@ -67,26 +99,22 @@ async def analyze_symptoms(
             
             if top_disease not in fallback_diseases:
                 ml_success = True
-                print(f"✅ ML Success: {top_disease}")
+                logger.debug("ML prediction accepted", extra={"disease": top_disease})
             else:
-                print(f"⚠️ ML returned fallback: {top_disease}")
+                logger.debug("ML returned fallback disease", extra={"disease": top_disease})
                 
     except Exception as e:
-        print(f"ML Error: {e}")
+        logger.warning("ML prediction failed", extra={"error": str(e)})
 
     # --- 4. If ML Failed, Use LLM Prediction ---
     if not ml_success:
-        print("🔄 Using LLM for disease prediction...")
+        logger.debug("Using LLM for disease prediction")
         
         groq_key = os.getenv("GROQ_API_KEY", "")
         
         if groq_key:
             try:
-                from groq import Groq
-                client = Groq(api_key=groq_key)
-                
-                response = client.chat.completions.create(
-                    model="llama3-8b-8192",
+                llm_text = await llm_service.groq_chat(
                     messages=[{
                         "role": "user",
                         "content": f"""Patient symptoms: {', '.join(symptom_list)}
@@ -103,18 +131,20 @@ Predict the top 3 most likely diseases. Return ONLY valid JSON:
                 )
                 
                 import json, re
-                llm_text = response.choices[0].message.content
                 
                 # Extract JSON
                 match = re.search(r'\{.*\}', llm_text, re.DOTALL)
                 if match:
                     ml_results = json.loads(match.group(0))
-                    print(f"✅ LLM Prediction: {ml_results['predictions'][0]['disease']}")
+                    logger.debug("LLM prediction", extra={"disease": ml_results['predictions'][0]['disease']})
                 else:
                     raise Exception("No JSON found")
                     
+            except CircuitOpenError:
+                logger.debug("Groq circuit open, using keyword prediction")
+                ml_results = keyword_based_prediction(symptom_list)
             except Exception as e:
-                print(f"LLM Error: {e}")
+                logger.warning("LLM prediction failed, using keyword prediction", extra={"error": str(e)})
                 ml_results = keyword_based_prediction(symptom_list)
         else:
             # No Groq key - use keyword prediction
@@ -131,15 +161,15 @@ Predict the top 3 most likely diseases. Return ONLY valid JSON:
             disease = 'Unknown'
         
         # Generate prescription using LLM service
-        ai_prescription = llm_service.generate_ai_prescription(
+        ai_prescription = await llm_service.generate_ai_prescription(
             symptom_list,
             disease,
             ml_results
         )
-        print(f"✅ Prescription: {len(ai_prescription.get('medications', []))} medications")
+        logger.debug("Prescription generated", extra={"medications": len(ai_prescription.get('medications', []))})
         
     except Exception as e:
-        print(f"Prescription Error: {e}")
+        logger.warning("Prescription generation failed", extra={"error": str(e)})
         ai_prescription = {
             "medications": [],
             "disclaimer": "Prescription generation unavailable. Please consult supervising physician."
@@ -159,7 +189,7 @@ Predict the top 3 most likely diseases. Return ONLY valid JSON:
             final_summary += f"\n\n💊 AI has suggested {med_count} medication(s) for educational review."
         
     except Exception as e:
-        print(f"Summary Error: {e}")
+        logger.warning("Summary generation failed", extra={"error": str(e)})
         final_summary = f"Analysis completed for symptoms: {', '.join(symptom_list)}. Please consult a healthcare provider."
 
     # --- 7. Save to DB ---
@@ -172,9 +202,9 @@ Predict the top 3 most likely diseases. Return ONLY valid JSON:
             llm_final_summary=final_summary
         )
         await new_history.insert()
-        print("✅ Saved to DB")
+        logger.debug("Analysis history saved")
     except Exception as e:
-        print(f"DB Error: {e}")
+        logger.error("Failed to save analysis history", extra={"error": str(e)})
     
     try:
         # Extract diagnosis from predictions
@@ -210,10 +240,11 @@ Predict the top 3 most likely diseases. Return ONLY valid JSON:
     
         await consultation.insert()
         consultation_id = str(consultation.id)  # Save for returning
-        print(f"✅ Consultation saved: {consultation_id}")
+        await analytics_service.record_consultation(consultation)
+        logger.info("Consultation saved", extra={"consultation_id": consultation_id})
     
     except Exception as e:
-        print(f"Consultation save error: {e}")
+        logger.error("Failed to save consultation", extra={"error": str(e)})
         consultation_id = None
     
     # Update return to include consultation_id
@@ -268,4 +299,5 @@ def keyword_based_prediction(symptoms: List[str]) -> dict:
 
 @router.get("/history", response_model=List[AnalysisResult])
 async def get_history(current_user: User = Depends(get_current_user)):
-    return await AnalysisResult.find(AnalysisResult.user_uid == current_user.username).to_list()
+    docs = await mongo.read_documents(AnalysisResult, {"user_uid": current_user.username})
+    return FastJSONResponse(docs)
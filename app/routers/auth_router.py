@@ -4,6 +4,7 @@ from datetime import timedelta
 from ..models import User, UserCreate, Token
 from ..auth import get_password_hash, verify_password, create_access_token, get_current_user
 from ..config import settings
+from ..services import roster_service
 
 router = APIRouter()
 
@@ -25,6 +26,8 @@ async def create_user(user: UserCreate):
         hashed_password=hashed_password
     )
     await new_user.insert()
+    if new_user.role == "patient":
+        roster_service.invalidate()
     return new_user
 
 @router.post("/login", response_model=Token)
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, Body
+from fastapi import APIRouter, Depends, Body, HTTPException, Query
 from ..models import User, Consultation
 from ..auth import get_current_user
-from typing import List
+from ..database import mongo
+from ..responses import FastJSONResponse
+from ..services import analytics_service, roster_service
+from typing import List, Optional
+from datetime import date, timedelta
 from beanie import PydanticObjectId
 router = APIRouter()
 
@@ -14,14 +18,33 @@ async def get_registered_patients(current_user: User = Depends(get_current_user)
         from fastapi import HTTPException
         raise HTTPException(status_code=403, detail="Only doctors can access this")
     
-    # Get all patients
-    patients = await User.find(User.role == "patient").to_list()
+    # Get all patients (only the fields the dashboard shows)
+    cursor = mongo.read_collection(User).find(
+        {"role": "patient"}, {"email": 1, "username": 1}
+    )
     
     return [{
-        "email": p.email,
-        "name": p.username,
-        "id": str(p.id)
-    } for p in patients]
+        "email": p.get("email"),
+        "name": p["username"],
+        "id": str(p["_id"])
+    } async for p in cursor]
+
+@router.get("/patients/roster")
+async def get_patient_roster(
+    q: Optional[str] = Query(None, min_length=1, description="Prefix of the patient's name or email"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Patients for the dashboard, one page at a time, ordered by name, with
+    how many consultations each has had with this doctor and when the last
+    one was. Pass `next_cursor` back as `cursor` for the following page.
+    """
+    if current_user.role != "doctor":
+        raise HTTPException(status_code=403, detail="Only doctors can access this")
+
+    return FastJSONResponse(await roster_service.roster_page(current_user.email, q, limit, cursor))
 
 @router.get("/my-consultations", response_model=List[Consultation])
 async def get_doctor_consultations(current_user: User = Depends(get_current_user)):
@@ -32,11 +55,11 @@ async def get_doctor_consultations(current_user: User = Depends(get_current_user
         from fastapi import HTTPException
         raise HTTPException(status_code=403, detail="Only doctors can access this")
     
-    consultations = await Consultation.find(
-        Consultation.doctor_email == current_user.email
-    ).sort(-Consultation.consultation_date).to_list()
+    consultations = await mongo.read_documents(
+        Consultation, {"doctor_email": current_user.email}, sort=[("consultation_date", -1)]
+    )
     
-    return consultations
+    return FastJSONResponse(consultations)
 
 @router.post("/schedule-followup")
 async def schedule_followup(
@@ -57,8 +80,43 @@ async def schedule_followup(
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Consultation not found")
     
+    first_followup = consultation.followup_date is None
     consultation.followup_date = followup_date
     consultation.followup_time = followup_time
     await consultation.save()
+    if first_followup:
+        await analytics_service.record_followup(consultation)
+    
+    return {"message": "Follow-up scheduled", "date": followup_date, "time": followup_time}
+
+def _stats_range(days: int):
+    end = date.today()
+    return end - timedelta(days=days - 1), end
+
+@router.get("/stats")
+async def get_stats_summary(
+    days: int = Query(30, ge=1, le=366),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Dashboard totals for the last `days` days: consultations, follow-up rate,
+    top diagnoses and symptoms. Reads only the pre-aggregated daily rollups.
+    """
+    if current_user.role != "doctor":
+        raise HTTPException(status_code=403, detail="Only doctors can access this")
+    
+    start, end = _stats_range(days)
+    return await analytics_service.summary(current_user.email, start, end, limit)
+
+@router.get("/stats/daily")
+async def get_daily_stats(
+    days: int = Query(30, ge=1, le=366),
+    current_user: User = Depends(get_current_user)
+):
+    """Per-day consultations, follow-ups and follow-up rate for the last `days` days"""
+    if current_user.role != "doctor":
+        raise HTTPException(status_code=403, detail="Only doctors can access this")
     
-    return {"message": "Follow-up scheduled", "date": followup_date, "time": followup_time}
\ No newline at end of file
+    start, end = _stats_range(days)
+    return await analytics_service.daily_stats(current_user.email, start, end)
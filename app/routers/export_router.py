@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from ..models import User, AnalysisResult, Consultation
+from ..auth import get_current_user
+from ..services import export_service
+from ..logger import get_logger
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _response(model, query, sort, fields, fmt, batch_size, name) -> StreamingResponse:
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    return StreamingResponse(
+        export_service.stream(model, query, sort, fields, fmt, batch_size),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/consultations")
+async def export_consultations(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    doctor: Optional[str] = Query(None, description="Doctor email"),
+    patient: Optional[str] = Query(None, description="Patient email"),
+    start: Optional[datetime] = Query(None, description="Consultations on or after this date"),
+    end: Optional[datetime] = Query(None, description="Consultations before this date"),
+    diagnosis: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated field names; default all"),
+    batch_size: int = Query(500, ge=1, le=5000),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream consultations as NDJSON or CSV.
+    Doctors export their own consultations, patients their own; exports
+    across all users for reporting go through `python -m app.cli.export`.
+    Dates without a timezone are taken as server local time.
+    """
+    query = {}
+    if current_user.role == "doctor":
+        if doctor and doctor != current_user.email:
+            raise HTTPException(status_code=403, detail="Doctors can only export their own consultations")
+        query["doctor_email"] = current_user.email
+        if patient:
+            query["patient_email"] = patient
+    else:
+        if doctor:
+            query["doctor_email"] = doctor
+        if patient and patient != current_user.email:
+            raise HTTPException(status_code=403, detail="Patients can only export their own consultations")
+        query["patient_email"] = current_user.email
+
+    date_range = export_service.date_range(start, end)
+    if date_range:
+        query["consultation_date"] = date_range
+    if diagnosis:
+        query["diagnosis"] = diagnosis
+
+    selected = export_service.select_fields(Consultation, fields)
+    return _response(Consultation, query, [("consultation_date", 1)], selected, format, batch_size, "consultations")
+
+
+@router.get("/analysis-history")
+async def export_analysis_history(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = Query(None, description="Analyses on or after this date"),
+    end: Optional[datetime] = Query(None, description="Analyses before this date"),
+    fields: Optional[str] = Query(None, description="Comma-separated field names; default all"),
+    batch_size: int = Query(500, ge=1, le=5000),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the current user's analysis history as NDJSON or CSV"""
+    query = {"user_uid": current_user.username}
+    # analysis_history has no timestamp field; ObjectIds carry the insert time
+    id_range = export_service.date_range(start, end, bound=export_service.object_id_bound)
+    if id_range:
+        query["_id"] = id_range
+
+    selected = export_service.select_fields(AnalysisResult, fields)
+    return _response(AnalysisResult, query, [("_id", 1)], selected, format, batch_size, "analysis-history")
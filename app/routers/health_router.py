@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from ..database import mongo
+from ..services.auditor_service import auditor
+from ..services.circuit_breaker import breakers
+
+router = APIRouter()
+
+@router.get("")
+async def liveness():
+    """Process is up; used by the platform's liveness probe"""
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness():
+    """
+    Ready to serve traffic when Mongo answers a ping; 503 otherwise so load
+    balancers stop routing here. The model is reported but not required,
+    since /api/analyze falls back to the LLM and keyword predictions.
+    """
+    database_ok = await mongo.ping()
+    return JSONResponse(
+        status_code=200 if database_ok else 503,
+        content={
+            "status": "ready" if database_ok else "not_ready",
+            "checks": {"database": database_ok, "model": auditor.model is not None},
+        },
+    )
+
+@router.get("/upstreams")
+async def upstreams():
+    """Circuit breaker state for each upstream (Groq, STT)"""
+    return {name: breaker.snapshot() for name, breaker in breakers.items()}
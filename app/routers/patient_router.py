@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from ..models import User, Consultation
 from ..auth import get_current_user
+from ..database import mongo
+from ..responses import FastJSONResponse
 from typing import List
 
 router = APIRouter()
@@ -13,11 +15,11 @@ async def get_my_consultations(current_user: User = Depends(get_current_user)):
     if current_user.role != "patient":
         raise HTTPException(status_code=403, detail="Only patients can access this")
     
-    consultations = await Consultation.find(
-        Consultation.patient_email == current_user.email
-    ).sort(-Consultation.consultation_date).to_list()
+    consultations = await mongo.read_documents(
+        Consultation, {"patient_email": current_user.email}, sort=[("consultation_date", -1)]
+    )
     
-    return consultations
+    return FastJSONResponse(consultations)
 
 @router.get("/consultation/{consultation_id}")
 async def get_consultation_details(
@@ -0,0 +1,86 @@
+import base64
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Depends, HTTPException, Query
+from ..models import User, Consultation
+from ..auth import get_current_user
+from ..database import mongo
+from ..responses import FastJSONResponse
+
+router = APIRouter()
+
+
+def _encode_cursor(doc: dict) -> str:
+    raw = f"{doc['consultation_date'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        when, _, oid = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(when), ObjectId(oid)
+    except (ValueError, InvalidId, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/search")
+async def search_consultations(
+    symptoms: Optional[str] = Query(None, description="Comma-separated symptoms, e.g. breathlessness,chestpain"),
+    match: str = Query("all", pattern="^(all|any)$", description="Require all symptoms or any of them"),
+    diagnosis: Optional[str] = Query(None, description="Exact diagnosis"),
+    q: Optional[str] = Query(None, description="Free text over diagnosis, summary and transcription"),
+    patient: Optional[str] = Query(None, description="Patient email (doctors only)"),
+    start: Optional[datetime] = Query(None, description="Consultations on or after this date"),
+    end: Optional[datetime] = Query(None, description="Consultations before this date"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Search consultations, newest first. Doctors see their own consultations,
+    patients their own (same rules as /api/patient/consultation/{id}).
+    Pass `next_cursor` back as `cursor` to get the following page.
+    """
+    if current_user.role == "doctor":
+        query = {"doctor_email": current_user.email}
+        if patient:
+            query["patient_email"] = patient
+    elif current_user.role == "patient":
+        if patient and patient != current_user.email:
+            raise HTTPException(status_code=403, detail="Access denied")
+        query = {"patient_email": current_user.email}
+    else:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    wanted = [s.strip().lower() for s in (symptoms or "").split(",") if s.strip()]
+    if wanted:
+        query["symptoms"] = {"$all" if match == "all" else "$in": wanted}
+    if diagnosis:
+        query["diagnosis"] = diagnosis
+    if q:
+        query["$text"] = {"$search": q}
+
+    if start or end:
+        query["consultation_date"] = {}
+        if start:
+            query["consultation_date"]["$gte"] = start
+        if end:
+            query["consultation_date"]["$lt"] = end
+
+    # Keyset pagination on (consultation_date, _id), both descending
+    if cursor:
+        last_date, last_id = _decode_cursor(cursor)
+        query["$or"] = [
+            {"consultation_date": {"$lt": last_date}},
+            {"consultation_date": last_date, "_id": {"$lt": last_id}},
+        ]
+
+    # One extra row tells us whether another page exists
+    docs = await mongo.read_documents(
+        Consultation, query, sort=[("consultation_date", -1), ("_id", -1)], limit=limit + 1
+    )
+    next_cursor = _encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+
+    return FastJSONResponse({"results": docs[:limit], "next_cursor": next_cursor})
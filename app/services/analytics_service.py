@@ -0,0 +1,210 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from pymongo import ReplaceOne
+from ..models import Consultation, DoctorDailyStats
+from ..logger import get_logger
+
+logger = get_logger(__name__)
+
+# Diagnosis and symptom names become field names under `diagnoses.` and
+# `symptoms.`; "." and "$" are not allowed there, so swap in full-width forms
+_ESCAPES = {".": "．", "$": "＄"}
+
+
+def escape_key(name: str) -> str:
+    for raw, escaped in _ESCAPES.items():
+        name = name.replace(raw, escaped)
+    return name
+
+
+def unescape_key(name: str) -> str:
+    for raw, escaped in _ESCAPES.items():
+        name = name.replace(escaped, raw)
+    return name
+
+
+def _diagnosis_key(diagnosis: Optional[str]) -> str:
+    return escape_key(diagnosis or "Unknown")
+
+
+def _symptom_keys(symptoms: Optional[Iterable[str]]) -> set:
+    # An empty name would make the field path "symptoms.", which Mongo rejects
+    return {escape_key(s) for s in symptoms or [] if s}
+
+
+def day_of(moment: datetime) -> str:
+    return moment.date().isoformat()
+
+
+def _collection():
+    return DoctorDailyStats.get_motor_collection()
+
+
+# --- Incremental updates (hot path) ---
+async def record_consultation(consultation: Consultation):
+    """One $inc upsert per new consultation. Never fails the caller."""
+    inc = {"consultations": 1, f"diagnoses.{_diagnosis_key(consultation.diagnosis)}": 1}
+    for symptom in _symptom_keys(consultation.symptoms):
+        inc[f"symptoms.{symptom}"] = 1
+    try:
+        await _collection().update_one(
+            {"doctor_email": consultation.doctor_email, "day": day_of(consultation.consultation_date)},
+            {"$inc": inc},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.error("Failed to update daily stats", extra={"error": str(e)})
+
+
+async def record_followup(consultation: Consultation):
+    """Counts a consultation's first follow-up against the day it took place."""
+    try:
+        await _collection().update_one(
+            {"doctor_email": consultation.doctor_email, "day": day_of(consultation.consultation_date)},
+            {"$inc": {"followups": 1}},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.error("Failed to update follow-up stats", extra={"error": str(e)})
+
+
+# --- Reads (dashboard) ---
+async def daily_stats(doctor_email: str, start: date, end: date) -> List[dict]:
+    """Per-day rows for [start, end], oldest first"""
+    cursor = _collection().find(
+        {"doctor_email": doctor_email, "day": {"$gte": start.isoformat(), "$lte": end.isoformat()}},
+        {"_id": 0, "day": 1, "consultations": 1, "followups": 1},
+    ).sort("day", 1)
+    rows = []
+    async for doc in cursor:
+        consultations = doc.get("consultations", 0)
+        followups = doc.get("followups", 0)
+        rows.append({
+            "day": doc["day"],
+            "consultations": consultations,
+            "followups": followups,
+            "followup_rate": round(followups / consultations, 3) if consultations else 0.0,
+        })
+    return rows
+
+
+async def summary(doctor_email: str, start: date, end: date, limit: int) -> dict:
+    """Totals, follow-up rate and top diagnoses/symptoms over [start, end]"""
+    consultations = followups = 0
+    diagnoses: Counter = Counter()
+    symptoms: Counter = Counter()
+    cursor = _collection().find(
+        {"doctor_email": doctor_email, "day": {"$gte": start.isoformat(), "$lte": end.isoformat()}},
+        {"_id": 0},
+    )
+    async for doc in cursor:
+        consultations += doc.get("consultations", 0)
+        followups += doc.get("followups", 0)
+        diagnoses.update(doc.get("diagnoses", {}))
+        symptoms.update(doc.get("symptoms", {}))
+
+    def top(counter: Counter, label: str):
+        # Ties broken by name so the order does not depend on storage order
+        ranked = sorted(counter.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+        return [{label: unescape_key(k), "count": v} for k, v in ranked]
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "consultations": consultations,
+        "followups": followups,
+        "followup_rate": round(followups / consultations, 3) if consultations else 0.0,
+        "top_diagnoses": top(diagnoses, "diagnosis"),
+        "top_symptoms": top(symptoms, "symptom"),
+    }
+
+
+# --- Backfill ---
+def _rollup(consultations: Iterable[dict]) -> Dict[tuple, dict]:
+    rows: Dict[tuple, dict] = {}
+    for c in consultations:
+        key = (c["doctor_email"], day_of(c["consultation_date"]))
+        row = rows.setdefault(key, {"consultations": 0, "followups": 0, "diagnoses": Counter(), "symptoms": Counter()})
+        row["consultations"] += 1
+        if c.get("followup_date"):
+            row["followups"] += 1
+        row["diagnoses"][_diagnosis_key(c.get("diagnosis"))] += 1
+        row["symptoms"].update(_symptom_keys(c.get("symptoms")))
+    return rows
+
+
+async def backfill(start: Optional[date] = None, end: Optional[date] = None, batch_size: int = 1000) -> int:
+    """
+    Rebuilds rollups from the consultations collection in date order, in
+    batches that never split a day, replacing the counters for those days.
+    Rollups for days in the range that no longer have any consultations
+    are deleted. Returns the number of rollup documents written.
+
+    Only days before today are rebuilt: today's rollups are still taking
+    live $inc updates, which a replace would overwrite. A follow-up
+    scheduled while its (past) day is being rewritten can still be lost, so
+    run this off-peak and re-run it for any range that matters.
+    """
+    cutoff = date.today() - timedelta(days=1)
+    if end is None or end > cutoff:
+        if end is not None:
+            logger.warning("Backfill end clamped to yesterday", extra={"requested_end": end.isoformat()})
+        end = cutoff
+    if start is not None and start > end:
+        return 0
+
+    query: dict = {"consultation_date": {"$lte": datetime.combine(end, datetime.max.time())}}
+    if start:
+        query["consultation_date"]["$gte"] = datetime.combine(start, datetime.min.time())
+
+    projection = {"_id": 0, "doctor_email": 1, "consultation_date": 1, "followup_date": 1, "diagnosis": 1, "symptoms": 1}
+    cursor = Consultation.get_motor_collection().find(query, projection).sort("consultation_date", 1).batch_size(batch_size)
+
+    written: set = set()
+    pending: List[dict] = []
+    current_day = None
+
+    async def flush(docs: List[dict]):
+        rows = _rollup(docs)
+        ops = [
+            ReplaceOne(
+                {"doctor_email": doctor, "day": day},
+                {"doctor_email": doctor, "day": day, "consultations": row["consultations"],
+                 "followups": row["followups"], "diagnoses": dict(row["diagnoses"]), "symptoms": dict(row["symptoms"])},
+                upsert=True,
+            )
+            for (doctor, day), row in rows.items()
+        ]
+        if ops:
+            await _collection().bulk_write(ops, ordered=False)
+        written.update(rows)
+
+    # Days arrive in order, so a day is complete once the next one starts
+    async for doc in cursor:
+        day = day_of(doc["consultation_date"])
+        if current_day is not None and day != current_day and len(pending) >= batch_size:
+            await flush(pending)
+            pending = []
+        current_day = day
+        pending.append(doc)
+    await flush(pending)
+
+    deleted = await _delete_stale(start, end, written, batch_size)
+    logger.info("Daily stats backfill finished", extra={"rollups": len(written), "deleted": deleted})
+    return len(written)
+
+
+async def _delete_stale(start: Optional[date], end: date, keep: set, batch_size: int) -> int:
+    """Deletes rollups in [start, end] whose (doctor, day) had no consultations"""
+    day_range = {"$lte": end.isoformat()}
+    if start:
+        day_range["$gte"] = start.isoformat()
+    stale = [
+        doc["_id"]
+        async for doc in _collection().find({"day": day_range}, {"doctor_email": 1, "day": 1})
+        if (doc["doctor_email"], doc["day"]) not in keep
+    ]
+    for i in range(0, len(stale), batch_size):
+        await _collection().delete_many({"_id": {"$in": stale[i:i + batch_size]}})
+    return len(stale)
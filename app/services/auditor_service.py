@@ -3,25 +3,24 @@ import pandas as pd
 import numpy as np
 from ..models import AuditorResponse, Prediction # Import Pydantic models
 from typing import List
+from ..logger import get_logger
+from .disease_catalog import catalog
+
+logger = get_logger(__name__)
 
 class AuditorService:
     model = None
     label_encoder = None
     symptom_columns = None
     severity_lookup = None
-    desc_lookup = None
-    prec_lookup = None
 
     def load_model(self):
         """
         Loads all ML models and data files from the /models and /data
         directories into memory. This is called once on app startup.
         """
-        print("AuditorService: Loading models and data...")
+        logger.info("AuditorService: Loading models and data...")
         try:
-            with open("models/ExtraTrees.pkl", "rb") as f:
-                self.model = pickle.load(f)
-                
             with open("models/le.pkl", "rb") as f:
                 self.label_encoder = pickle.load(f)
                 
@@ -36,84 +35,79 @@ class AuditorService:
                 index=df_severity.Symptom.str.strip().str.replace(' ', '_')
             ).to_dict()
             
-            df_desc = pd.read_csv('data/symptom_Description.csv')
-            self.desc_lookup = pd.Series(
-                df_desc.Description.values, 
-                index=df_desc.Disease
-            ).to_dict()
-            
-            self.prec_lookup = pd.read_csv('data/symptom_precaution.csv').set_index('Disease')
+            # Descriptions and precautions come from the shared disease catalog
+            catalog.load()
+            missing = [str(d) for d in self.label_encoder.classes_ if not catalog.has(str(d))]
+            if missing:
+                logger.warning("AuditorService: Diseases missing from disease_catalog.json", extra={"diseases": missing})
+
+            # The classifier is the largest artifact; load it last so the
+            # lookups above are usable even if it is missing
+            with open("models/ExtraTrees.pkl", "rb") as f:
+                self.model = pickle.load(f)
             
-            print("AuditorService: All models and data loaded successfully.")
+            logger.info("AuditorService: All models and data loaded successfully.")
             
         except FileNotFoundError as e:
-            print(f"FATAL AUDITOR ERROR: Missing file {e.filename}")
+            logger.critical("AuditorService: Missing file", extra={"file": e.filename})
             # You could raise the exception here to stop the server
         except Exception as e:
-            print(f"FATAL AUDITOR ERROR: {e}")
+            logger.critical("AuditorService: Failed to load", extra={"error": str(e)})
 
     def predict(self, patient_symptoms_list: List[str]) -> AuditorResponse:
         """
         Takes a list of symptoms from the LLM and predicts a disease.
         """
+        logger.debug("AuditorService: Predicting", extra={"symptoms": patient_symptoms_list})
+        return self.predict_batch([patient_symptoms_list])[0]
+
+    def predict_batch(self, symptom_lists: List[List[str]]) -> List[AuditorResponse]:
+        """
+        Same as predict() for many patients at once: one input matrix and a
+        single predict_proba call, which is far cheaper than row-by-row.
+        """
         if self.model is None:
-            return AuditorResponse(predictions=[]) # Return empty if model failed to load
+            # Return empty if model failed to load
+            return [AuditorResponse(predictions=[]) for _ in symptom_lists]
 
-        print(f"AuditorService: Predicting for symptoms: {patient_symptoms_list}")
-        
-        # 1. Create the input vector (a row of zeros)
-        input_vector = pd.Series(0, index=self.symptom_columns)
-        
-        # 2. Populate the vector with severity weights
-        for symptom in patient_symptoms_list:
-            symptom_cleaned = symptom.strip().replace(' ', '_')
-            if symptom_cleaned in input_vector.index:
-                # Use the weighted severity!
-                weight = self.severity_lookup.get(symptom_cleaned, 1) # Default to 1 if not found
-                input_vector[symptom_cleaned] = weight
-            else:
-                print(f"AuditorService: Warning - symptom '{symptom}' not in columns.")
-        
-        # 3. Reshape for the model
-        input_array = input_vector.values.reshape(1, -1)
-        
-        # 4. Run prediction
-        proba = self.model.predict_proba(input_array)[0]
-        top3_idx = np.argsort(proba)[-3:][::-1] # Get top 3
-        
-        top3_names = self.label_encoder.inverse_transform(top3_idx)
-        top3_proba = proba[top3_idx]
-        
-        # 5. Format the output using Pydantic models
-        predictions = []
-        for disease, prob in zip(top3_names, top3_proba):
-            if prob < 0.05: continue # Filter out very low probability
-                
-            # Get precautions
-            prec_dict = {}
-            try:
-                # Use .get(col) to avoid errors if a precaution is missing (NaN)
-                prec_row = self.prec_lookup.loc[disease]
-                prec_dict = {
-                    "precaution_1": prec_row.get('Precaution_1'),
-                    "precaution_2": prec_row.get('Precaution_2'),
-                    "precaution_3": prec_row.get('Precaution_3'),
-                    "precaution_4": prec_row.get('Precaution_4'),
-                }
-            except KeyError:
-                prec_dict = {"info": "No precautions available."}
+        # 1. Build the input matrix, one row of severity weights per patient
+        column_index = {name: i for i, name in enumerate(self.symptom_columns)}
+        input_array = np.zeros((len(symptom_lists), len(column_index)))
+        for row, symptoms in enumerate(symptom_lists):
+            for symptom in symptoms:
+                symptom_cleaned = symptom.strip().replace(' ', '_')
+                if symptom_cleaned in column_index:
+                    # Use the weighted severity! Default to 1 if not found
+                    input_array[row, column_index[symptom_cleaned]] = self.severity_lookup.get(symptom_cleaned, 1)
+                else:
+                    logger.debug("AuditorService: Symptom not in columns", extra={"symptom": symptom})
 
-            predictions.append(
-                Prediction(
-                    disease=str(disease),
-                    probability=f"{prob*100:.2f}%",
-                    description=self.desc_lookup.get(disease, "No description available."),
-                    precautions=prec_dict
-                )
-            )
-            
-        print(f"AuditorService: Predictions complete.")
-        return AuditorResponse(predictions=predictions)
+        # 2. Run prediction and keep the top 3 per row
+        proba = self.model.predict_proba(input_array)
+        top3_idx = np.argsort(proba, axis=1)[:, -3:][:, ::-1]
+
+        results = []
+        for row, idx in enumerate(top3_idx):
+            top3_names = self.label_encoder.inverse_transform(idx)
+            predictions = [
+                self._prediction(disease, prob)
+                for disease, prob in zip(top3_names, proba[row, idx])
+                if prob >= 0.05  # Filter out very low probability
+            ]
+            results.append(AuditorResponse(predictions=predictions))
+
+        logger.debug("AuditorService: Predictions complete.", extra={"rows": len(results)})
+        return results
+
+    def _prediction(self, disease, prob) -> Prediction:
+        """Formats one prediction using the Pydantic models"""
+        description, precautions = catalog.describe(str(disease))
+        return Prediction(
+            disease=str(disease),
+            probability=f"{prob*100:.2f}%",
+            description=description,
+            precautions=precautions
+        )
 
 # Create a single global instance that the rest of the app will import
 auditor = AuditorService()
\ No newline at end of file
@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Tuple
+from ..config import settings
+from ..logger import get_logger
+from .. import metrics
+
+logger = get_logger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open"""
+    def __init__(self, name: str):
+        super().__init__(f"Circuit '{name}' is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Per-upstream breaker over a sliding time window.
+
+    CLOSED: calls go through; once the window holds at least `min_calls`
+    calls and either the failure rate or the slow-call rate crosses its
+    threshold, the breaker opens.
+    OPEN: calls are refused (callers use their fallback) for `open_seconds`.
+    HALF_OPEN: up to `half_open_probes` calls are let through; a successful
+    probe closes the breaker, a failed or slow one re-opens it. Every allowed
+    call must end in record_success/record_failure, or release() if it was
+    cancelled.
+
+    Thread-safe, since upstream calls may run in worker threads.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        slow_call_seconds: float,
+        window_seconds: float = 60.0,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_rate_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+        self._calls: Deque[Tuple[float, bool, bool]] = deque()  # (timestamp, failed, slow)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.counters = {"success": 0, "failure": 0, "slow": 0, "short_circuited": 0, "opened": 0}
+
+    # --- State handling (call with the lock held) ---
+    def _prune(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def _transition(self, state: str, now: float):
+        if state == self.state:
+            return
+        logger.warning("Circuit state change", extra={"upstream": self.name, "from_state": self.state, "to_state": state})
+        self.state = state
+        if state == self.OPEN:
+            self._opened_at = now
+            self.counters["opened"] += 1
+        elif state == self.CLOSED:
+            self._calls.clear()
+        self._probes_in_flight = 0
+
+    def _rates(self) -> Tuple[float, float]:
+        total = len(self._calls)
+        if not total:
+            return 0.0, 0.0
+        failed = sum(1 for _, f, _ in self._calls if f)
+        slow = sum(1 for _, _, s in self._calls if s)
+        return failed / total, slow / total
+
+    # --- Public API ---
+    def allow(self) -> bool:
+        """True if the caller may hit the upstream now; False means use the fallback."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self._opened_at >= self.open_seconds:
+                self._transition(self.HALF_OPEN, now)
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self.counters["short_circuited"] += 1
+            return False
+
+    def record(self, latency: float, failed: bool):
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            now = time.monotonic()
+            self.counters["failure" if failed else "success"] += 1
+            if slow:
+                self.counters["slow"] += 1
+
+            if self.state == self.HALF_OPEN:
+                self._transition(self.OPEN if failed or slow else self.CLOSED, now)
+                return
+            if self.state == self.OPEN:
+                return
+
+            self._calls.append((now, failed, slow))
+            self._prune(now)
+            if len(self._calls) >= self.min_calls:
+                failure_rate, slow_rate = self._rates()
+                if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                    self._transition(self.OPEN, now)
+
+    def release(self):
+        """
+        Gives back a half-open probe slot for a call that ended without an
+        outcome (e.g. the awaiting request was cancelled). Without this the
+        breaker would stay HALF_OPEN with every slot taken.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def record_success(self, latency: float):
+        self.record(latency, failed=False)
+
+    def record_failure(self, latency: float):
+        self.record(latency, failed=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            failure_rate, slow_rate = self._rates()
+            retry_in = max(0.0, self.open_seconds - (now - self._opened_at)) if self.state == self.OPEN else 0.0
+            return {
+                "state": self.state,
+                "window_calls": len(self._calls),
+                "failure_rate": round(failure_rate, 3),
+                "slow_call_rate": round(slow_rate, 3),
+                "retry_in_seconds": round(retry_in, 1),
+                "counters": dict(self.counters),
+            }
+
+
+def _make_breaker(name: str, slow_call_seconds: float) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        slow_call_seconds=slow_call_seconds,
+        window_seconds=settings.CIRCUIT_WINDOW_SECONDS,
+        min_calls=settings.CIRCUIT_MIN_CALLS,
+        failure_rate_threshold=settings.CIRCUIT_FAILURE_RATE,
+        slow_call_rate_threshold=settings.CIRCUIT_SLOW_CALL_RATE,
+        open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+        half_open_probes=settings.CIRCUIT_HALF_OPEN_PROBES,
+    )
+
+
+# One breaker per upstream, shared by every caller of that upstream
+groq_breaker = _make_breaker("groq", settings.GROQ_SLOW_CALL_SECONDS)
+stt_breaker = _make_breaker("stt", settings.STT_SLOW_CALL_SECONDS)
+breakers = {b.name: b for b in (groq_breaker, stt_breaker)}
+
+_STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+
+@metrics.collector
+def _breaker_metrics():
+    snapshots = {name: b.snapshot() for name, b in breakers.items()}
+    yield metrics.Metric(
+        "upstream_circuit_state", "gauge",
+        "Circuit breaker state per upstream (0=closed, 1=half_open, 2=open)",
+        [({"upstream": n}, _STATE_VALUES[s["state"]]) for n, s in snapshots.items()],
+    )
+    yield metrics.Metric(
+        "upstream_calls_total", "counter",
+        "Upstream calls by outcome, including calls refused by an open circuit",
+        [({"upstream": n, "outcome": k}, s["counters"][k]) for n, s in snapshots.items() for k in ("success", "failure", "short_circuited")],
+    )
+    yield metrics.Metric(
+        "upstream_slow_calls_total", "counter",
+        "Upstream calls slower than the slow-call threshold",
+        [({"upstream": n}, s["counters"]["slow"]) for n, s in snapshots.items()],
+    )
+    yield metrics.Metric(
+        "upstream_circuit_opened_total", "counter",
+        "Times each circuit has opened",
+        [({"upstream": n}, s["counters"]["opened"]) for n, s in snapshots.items()],
+    )
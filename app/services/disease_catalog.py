@@ -0,0 +1,204 @@
+"""
+Reference data for diseases: descriptions and precautions from data/*.csv,
+plus stable integer IDs from data/disease_catalog.json.
+
+Stored predictions can then be compact: {"catalog": <version>, "predictions":
+[{"id": 7, "p": 0.2}, ...]} instead of repeating the description and
+precaution strings in every document. hydrate() turns either form back into
+the full payload, so old documents keep working.
+
+disease_catalog.json is append-only. IDs are list positions: add new
+diseases at the end, bump "version" and add a "versions" entry with the new
+size and fingerprint_names() of the list; never reorder or remove entries.
+load() checks every recorded version against the list, and hydrate() only
+maps ids through a version it knows, so an edit can't silently remap stored
+ids to other diseases.
+"""
+import hashlib
+import json
+import math
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from pydantic import BaseModel
+from ..logger import get_logger
+
+logger = get_logger(__name__)
+
+CATALOG_PATH = "data/disease_catalog.json"
+NO_DESCRIPTION = "No description available."
+NO_PRECAUTIONS = {"info": "No precautions available."}
+_FULL_KEYS = {"disease", "probability", "description", "precautions"}
+
+
+class CatalogVersionError(ValueError):
+    """Stored predictions reference a catalog this process can't map"""
+
+
+def fingerprint_names(names: List[str]) -> str:
+    return hashlib.sha256("\n".join(names).encode("utf-8")).hexdigest()
+
+
+def _same(a, b) -> bool:
+    """Equality that treats NaN (missing CSV cells) as equal to NaN"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+def format_probability(p: float) -> str:
+    return f"{p*100:.2f}%"
+
+
+def _parse_probability(text) -> Optional[float]:
+    """"12.34%" -> 0.1234, only when formatting it back gives the same string"""
+    if not isinstance(text, str) or not text.endswith("%"):
+        return None
+    try:
+        p = float(text[:-1]) / 100
+    except ValueError:
+        return None
+    return p if format_probability(p) == text else None
+
+
+class DiseaseCatalog:
+    version = None
+
+    def __init__(self):
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._descriptions: Dict[str, str] = {}
+        self._precautions = None
+        self._described: Dict[str, Tuple[str, dict]] = {}
+        self._sizes: Dict[int, int] = {}  # version -> number of diseases it had
+
+    def load(self, path: str = CATALOG_PATH):
+        with open(path, encoding="utf-8") as f:
+            registry = json.load(f)
+        df_desc = pd.read_csv('data/symptom_Description.csv')
+        self._descriptions = pd.Series(df_desc.Description.values, index=df_desc.Disease).to_dict()
+        self._precautions = pd.read_csv('data/symptom_precaution.csv').set_index('Disease')
+        names = list(registry["diseases"])
+        sizes = self._check_versions(registry, names)
+        self._names = names
+        self._sizes = sizes
+        self._ids = {name: i for i, name in enumerate(self._names)}
+        self._described = {}
+        self.version = registry["version"]
+        # Hydration runs per stored prediction, so skip pandas on that path
+        for name in self._names:
+            self.describe(name)
+        logger.info("Disease catalog loaded", extra={"version": self.version, "diseases": len(self._names)})
+
+    @staticmethod
+    def _check_versions(registry: dict, names: List[str]) -> Dict[int, int]:
+        """Every recorded version must still be a prefix of the list, unchanged"""
+        sizes = {}
+        for entry in registry.get("versions", []):
+            size = entry["size"]
+            if size > len(names) or fingerprint_names(names[:size]) != entry["sha256"]:
+                raise CatalogVersionError(
+                    f"disease_catalog.json: the first {size} diseases no longer match version "
+                    f"{entry['version']}; entries must only be appended"
+                )
+            sizes[entry["version"]] = size
+        if sizes.get(registry["version"]) != len(names):
+            raise CatalogVersionError(
+                f"disease_catalog.json: version {registry['version']} needs a \"versions\" entry "
+                f"with size {len(names)} and sha256 {fingerprint_names(names)}"
+            )
+        return sizes
+
+    def _ensure_loaded(self):
+        if self.version is None:
+            self.load()
+
+    def has(self, disease: str) -> bool:
+        self._ensure_loaded()
+        return disease in self._ids
+
+    def describe(self, disease: str) -> Tuple[str, dict]:
+        """(description, precautions) as the auditor reports them"""
+        self._ensure_loaded()
+        cached = self._described.get(disease)
+        if cached is None:
+            cached = self._described[disease] = self._lookup(disease)
+        description, precautions = cached
+        return description, dict(precautions)
+
+    def _lookup(self, disease: str) -> Tuple[str, dict]:
+        try:
+            # Use .get(col) to avoid errors if a precaution is missing (NaN)
+            prec_row = self._precautions.loc[disease]
+            precautions = {
+                "precaution_1": prec_row.get('Precaution_1'),
+                "precaution_2": prec_row.get('Precaution_2'),
+                "precaution_3": prec_row.get('Precaution_3'),
+                "precaution_4": prec_row.get('Precaution_4'),
+            }
+        except KeyError:
+            precautions = dict(NO_PRECAUTIONS)
+        return self._descriptions.get(disease, NO_DESCRIPTION), precautions
+
+    # --- Storage format ---
+    def _compact_entry(self, entry):
+        """{"id", "p"} when that loses nothing, else the entry unchanged"""
+        if not isinstance(entry, dict) or entry.keys() != _FULL_KEYS or entry["disease"] not in self._ids:
+            return entry
+        p = _parse_probability(entry["probability"])
+        if p is None:
+            return entry
+        description, precautions = self.describe(entry["disease"])
+        if entry["description"] != description or not _same(entry["precautions"], precautions):
+            return entry
+        return {"id": self._ids[entry["disease"]], "p": p}
+
+    def _hydrate_entry(self, entry, size: int):
+        if not isinstance(entry, dict) or "id" not in entry:
+            return entry
+        disease_id = entry["id"]
+        if not 0 <= disease_id < size:
+            raise CatalogVersionError(f"Disease id {disease_id} is outside its catalog version ({size} diseases)")
+        disease = self._names[disease_id]
+        description, precautions = self.describe(disease)
+        return {"disease": disease, "probability": format_probability(entry["p"]),
+                "description": description, "precautions": precautions}
+
+    def compact(self, payload):
+        """
+        Storage form of an ML/LLM predictions payload (dict or AuditorResponse).
+        Only catalog diseases whose text matches the catalog are shortened;
+        anything else (e.g. LLM predictions) is kept as is.
+        """
+        if isinstance(payload, BaseModel):
+            payload = payload.model_dump()
+        if not isinstance(payload, dict) or "catalog" in payload or not isinstance(payload.get("predictions"), list):
+            return payload
+        self._ensure_loaded()
+        predictions = [self._compact_entry(p) for p in payload["predictions"]]
+        if all(p is q for p, q in zip(predictions, payload["predictions"])):
+            return payload
+        return {**payload, "catalog": self.version, "predictions": predictions}
+
+    def hydrate(self, payload):
+        """
+        Full form of a stored payload; full payloads pass through untouched.
+        Raises CatalogVersionError for a catalog version this process
+        doesn't have (written by a newer deploy), instead of guessing.
+        """
+        if not isinstance(payload, dict) or "catalog" not in payload:
+            return payload
+        self._ensure_loaded()
+        size = self._sizes.get(payload["catalog"])
+        if size is None:
+            raise CatalogVersionError(
+                f"Stored predictions use disease catalog version {payload['catalog']!r}; "
+                f"this process knows versions {sorted(self._sizes)}"
+            )
+        hydrated = {k: v for k, v in payload.items() if k != "catalog"}
+        hydrated["predictions"] = [self._hydrate_entry(p, size) for p in payload.get("predictions", [])]
+        return hydrated
+
+
+catalog = DiseaseCatalog()
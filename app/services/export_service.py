@@ -0,0 +1,117 @@
+"""
+Streaming NDJSON/CSV export shared by the per-user endpoints
+(routers.export_router) and the reporting CLI (app.cli.export), which
+exports across all users.
+"""
+import csv
+import io
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Type
+from beanie import Document
+from bson import ObjectId
+from fastapi import HTTPException
+from ..database import mongo
+from ..responses import dumps
+from .disease_catalog import catalog
+from ..logger import get_logger
+
+logger = get_logger(__name__)
+
+FORMATS = ("ndjson", "csv")
+
+
+def stored_fields(model: Type[Document]) -> List[str]:
+    return [f.alias or name for name, f in model.model_fields.items() if not f.exclude]
+
+
+def select_fields(model: Type[Document], fields: Optional[str]) -> List[str]:
+    available = stored_fields(model)
+    if not fields:
+        return available
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in available]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    return selected
+
+
+def local_naive(moment: datetime) -> datetime:
+    """
+    Bound for a stored naive date (e.g. consultation_date, written with
+    datetime.now(), i.e. server local time). Aware inputs are converted to
+    local time; naive ones are taken as local already.
+    """
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def object_id_bound(moment: datetime) -> ObjectId:
+    """
+    ObjectId bound for an insert-time range. ObjectId.from_datetime reads
+    naive values as UTC, so naive inputs (server local time, as above) are
+    converted first.
+    """
+    return ObjectId.from_datetime(moment.astimezone(timezone.utc))
+
+
+def date_range(start: Optional[datetime], end: Optional[datetime], bound=local_naive) -> Optional[dict]:
+    """{"$gte": start, "$lt": end} with both bounds normalised, or None"""
+    if not (start or end):
+        return None
+    query = {}
+    if start:
+        query["$gte"] = bound(start)
+    if end:
+        query["$lt"] = bound(end)
+    return query
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return "; ".join(value)
+    if isinstance(value, (list, dict)):
+        return dumps(value).decode()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def stream(model: Type[Document], query: dict, sort: list, fields: List[str], fmt: str, batch_size: int) -> AsyncIterator[bytes]:
+    """
+    Streams documents straight off a Motor cursor, one encoded chunk per
+    server batch, so memory stays at roughly one batch whatever the total.
+    """
+    projection = {f: 1 for f in fields}
+    if "_id" not in fields:
+        projection["_id"] = 0
+    cursor = mongo.read_collection(model).find(query, projection).sort(sort).batch_size(batch_size)
+    compact_fields = [f for f in getattr(model, "compact_fields", ()) if f in fields]
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(fields)
+
+    chunk: List[bytes] = []
+    count = 0
+    async for doc in cursor:
+        for field in compact_fields:
+            if field in doc:
+                doc[field] = catalog.hydrate(doc[field])
+        if writer:
+            writer.writerow([_csv_cell(doc.get(f)) for f in fields])
+        else:
+            chunk.append(dumps(doc) + b"\n")
+        count += 1
+        if count % batch_size == 0:
+            if writer:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                yield b"".join(chunk)
+                chunk = []
+
+    yield buffer.getvalue().encode() if writer else b"".join(chunk)
+    logger.info("Export finished", extra={"collection": model.Settings.name, "records": count, "format": fmt})
@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from pymongo.errors import DuplicateKeyError
+from ..config import settings
+from ..models import IdempotencyRecord
+from ..logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+# Runs owned by this worker, so same-worker duplicates wake up immediately
+# instead of polling Mongo
+_local_runs: Dict[Tuple[str, str], asyncio.Event] = {}
+
+
+def request_fingerprint(text: Optional[str], audio: Optional[bytes]) -> str:
+    """Hash of what the request submits, to tell a retry from a reused key"""
+    digest = hashlib.sha256()
+    for part in (text.encode() if text is not None else None, audio):
+        # Length-prefixed, so text="ab" and audio=b"c" differ from text="a", audio=b"bc"
+        digest.update(b"-" if part is None else b"%d:" % len(part) + part)
+    return digest.hexdigest()
+
+
+def _collection():
+    return IdempotencyRecord.get_motor_collection()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def _claim(user: str, key: str, token: str, request_hash: str) -> bool:
+    """Becomes the owner of (user, key): a new record, or a stale in-progress one"""
+    now = _now()
+    lease = {
+        "status": "in_progress",
+        "token": token,
+        "request_hash": request_hash,
+        "lease_until": now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS),
+        "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+    }
+    try:
+        await _collection().insert_one({"user": user, "key": key, "response": None, "created_at": now, **lease})
+        return True
+    except DuplicateKeyError:
+        pass
+    # The owner of an expired lease is assumed to have died mid-request
+    taken = await _collection().find_one_and_update(
+        {"user": user, "key": key, "status": "in_progress", "lease_until": {"$lt": now},
+         "request_hash": {"$in": [request_hash, None]}},
+        {"$set": lease},
+    )
+    if taken:
+        logger.warning("Took over stale idempotent request", extra={"key": key})
+    return taken is not None
+
+
+async def _wait(user: str, key: str, delay: float):
+    event = _local_runs.get((user, key))
+    if event is None:
+        await asyncio.sleep(delay)
+        return
+    try:
+        await asyncio.wait_for(event.wait(), delay)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def run_once(user: str, key: str, request_hash: str, handler: Callable[[], Awaitable[dict]]) -> Tuple[dict, bool]:
+    """
+    Runs `handler` at most once per (user, key) and returns (response, replayed).
+    A repeat gets the stored response; a duplicate that arrives while the
+    first run is in progress waits for it (up to IDEMPOTENCY_WAIT_SECONDS,
+    then 409). A key reused with a different `request_hash` gets 422. If the
+    handler raises, the key is released so a retry runs again.
+    """
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters")
+
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.05
+    while not await _claim(user, key, token, request_hash):
+        record = await _collection().find_one({"user": user, "key": key}, {"status": 1, "response": 1, "request_hash": 1})
+        if record and record.get("request_hash") not in (None, request_hash):
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request",
+            )
+        if record and record["status"] == "completed":
+            logger.info("Replaying idempotent response", extra={"key": key})
+            return record["response"], True
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "5"},
+            )
+        await _wait(user, key, delay)
+        delay = min(delay * 2, 1.0)
+
+    event = _local_runs[(user, key)] = asyncio.Event()
+    try:
+        response = jsonable_encoder(await handler())
+    except BaseException:
+        await _collection().delete_one({"user": user, "key": key, "token": token})
+        raise
+    else:
+        await _collection().update_one(
+            {"user": user, "key": key, "token": token},
+            {"$set": {"status": "completed", "response": response}},
+        )
+        return response, False
+    finally:
+        _local_runs.pop((user, key), None)
+        event.set()
@@ -1,61 +1,78 @@
 from typing import List
+import asyncio
 import os
+import time
+from ..config import settings
+from ..logger import get_logger
+from .circuit_breaker import groq_breaker, CircuitOpenError
+from .upstream import run_blocking
+from .symptoms import SYMPTOM_MAPPING
+from .prescription_rules import rule_engine
 
-def extract_symptoms_from_text(raw_text: str) -> List[str]:
-    """Extract symptoms from patient description"""
+logger = get_logger(__name__)
+
+_groq_client = None
+
+
+def _get_groq_client(api_key: str):
+    """One Groq client per process: fast-fail timeout, no SDK retries (the breaker handles those)"""
+    global _groq_client
+    if _groq_client is None or _groq_client.api_key != api_key:
+        from groq import Groq
+        _groq_client = Groq(api_key=api_key, timeout=settings.GROQ_TIMEOUT_SECONDS, max_retries=0)
+    return _groq_client
+
+
+async def groq_chat(messages: List[dict], temperature: float, max_tokens: int) -> str:
+    """
+    Runs one Groq chat completion through the circuit breaker and returns the
+    reply text. Raises CircuitOpenError without calling Groq while the
+    breaker is open; callers fall back exactly as they do on any other error.
+    """
+    groq_key = os.getenv("GROQ_API_KEY", "")
+    if not groq_breaker.allow():
+        raise CircuitOpenError(groq_breaker.name)
+
+    started = time.monotonic()
+    try:
+        # The Groq client is blocking; run it on the upstream pool with a hard deadline
+        response = await run_blocking(
+            _get_groq_client(groq_key).chat.completions.create,
+            model="llama3-8b-8192",
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=settings.GROQ_TIMEOUT_SECONDS
+        )
+    except asyncio.CancelledError:
+        groq_breaker.release()
+        raise
+    except Exception:
+        groq_breaker.record_failure(time.monotonic() - started)
+        raise
+    groq_breaker.record_success(time.monotonic() - started)
+    return response.choices[0].message.content
+
+
+def match_symptoms(raw_text: str) -> List[str]:
+    """Symptoms named in the text, in mapping order; empty if none are recognised"""
     text = raw_text.lower()
     
-    symptom_mapping = {
-        'headache': 'headache',
-        'head pain': 'headache',
-        'head': 'headache',
-        'fever': 'highfever',
-        'temperature': 'highfever',
-        'high fever': 'highfever',
-        'cough': 'cough',
-        'coughing': 'cough',
-        'sneez': 'continuoussneezing',
-        'burn': 'burningmicturition',
-        'burning': 'burningmicturition',
-        'runny': 'runnynose',
-        'running nose': 'runnynose',
-        'nose': 'runnynose',
-        'joint': 'jointpain',
-        'pain': 'jointpain',
-        'weak': 'muscleweakness',
-        'muscle pain': 'musclepain',
-        'body ache': 'musclepain',
-        'ache': 'musclepain',
-        'tired': 'fatigue',
-        'fatigue': 'fatigue',
-        'nausea': 'nausea',
-        'vomit': 'vomiting',
-        'stomach': 'stomachpain',
-        'belly': 'stomachpain',
-        'dizzy': 'dizziness',
-        'skin': 'skinrash',
-        'rash': 'skinrash',
-        'itch': 'itching',
-        'breathe': 'breathlessness',
-        'breath': 'breathlessness',
-        'chest': 'chestpain',
-        'sweat': 'sweating',
-        'appetite': 'lossofappetite',
-        'chill': 'chills',
-        'shiver': 'shivering',
-        'cold': 'chills',
-        'throat': 'throatirritation',
-    }
-    
     symptoms = []
-    for keyword, symptom in symptom_mapping.items():
+    for keyword, symptom in SYMPTOM_MAPPING.items():
         if keyword in text and symptom not in symptoms:
             symptoms.append(symptom)
+    return symptoms
+
+
+def extract_symptoms_from_text(raw_text: str) -> List[str]:
+    """Extract symptoms from patient description"""
+    symptoms = match_symptoms(raw_text)
     
     if not symptoms:
         symptoms = ['headache', 'fatigue']
     
-    print(f"LLM: Extracted symptoms: {symptoms}")
+    logger.debug("Extracted symptoms", extra={"symptoms": symptoms})
     return symptoms
 
 
@@ -83,22 +100,22 @@ def generate_final_summary(raw_text: str, ml_results) -> str:
     return "Analysis completed. Please consult a healthcare provider."
 
 
-def generate_ai_prescription(symptoms: List[str], disease: str, ml_results: dict) -> dict:
+async def generate_ai_prescription(symptoms: List[str], disease: str, ml_results: dict) -> dict:
     """
     Generate AI-suggested prescription for educational/intern review
     Returns medicine suggestions with disclaimer
     """
+    # PRESCRIPTION_MODE=rules: diseases with a rule never reach Groq
+    if settings.PRESCRIPTION_MODE == "rules" and rule_engine.has_rule_for(disease):
+        return generate_rule_based_prescription(symptoms, disease)
+
     groq_key = os.getenv("GROQ_API_KEY", "")
     
     if groq_key:
         try:
-            from groq import Groq
             import json, re
             
-            client = Groq(api_key=groq_key)
-            
-            response = client.chat.completions.create(
-                model="llama3-8b-8192",
+            llm_text = await groq_chat(
                 messages=[{
                     "role": "system",
                     "content": "You are a medical AI assistant helping medical interns learn about common treatments. Provide educational medication suggestions with proper dosages."
@@ -130,81 +147,24 @@ Return ONLY valid JSON:
                 max_tokens=600
             )
             
-            llm_text = response.choices[0].message.content
             match = re.search(r'\{.*\}', llm_text, re.DOTALL)
             
             if match:
                 prescription = json.loads(match.group(0))
-                print(f"✅ AI Prescription generated")
+                logger.debug("AI prescription generated")
                 return prescription
             else:
                 raise Exception("No JSON in response")
                 
+        except CircuitOpenError:
+            logger.debug("Groq circuit open, using rule-based prescription")
         except Exception as e:
-            print(f"Prescription generation error: {e}")
+            logger.warning("AI prescription failed, using rule-based prescription", extra={"error": str(e)})
     
     # Fallback: Rule-based prescription
     return generate_rule_based_prescription(symptoms, disease)
 
 
 def generate_rule_based_prescription(symptoms: List[str], disease: str) -> dict:
-    """Fallback rule-based prescription generator"""
-    
-    medications = []
-    
-    # Common cold/respiratory
-    if any(s in symptoms for s in ['cough', 'runnynose', 'throatirritation']):
-        medications.append({
-            "name": "Paracetamol 500mg",
-            "dosage": "1 tablet",
-            "duration": "5 days",
-            "instructions": "Take twice daily after meals"
-        })
-        medications.append({
-            "name": "Cetirizine 10mg",
-            "dosage": "1 tablet",
-            "duration": "5 days",
-            "instructions": "Take once daily at bedtime"
-        })
-    
-    # Fever
-    if 'highfever' in symptoms or 'fever' in disease.lower():
-        medications.append({
-            "name": "Ibuprofen 400mg",
-            "dosage": "1 tablet",
-            "duration": "3 days",
-            "instructions": "Take three times daily with food"
-        })
-    
-    # Headache
-    if 'headache' in symptoms:
-        if not any(m['name'].startswith('Paracetamol') for m in medications):
-            medications.append({
-                "name": "Paracetamol 500mg",
-                "dosage": "1 tablet",
-                "duration": "As needed",
-                "instructions": "Take when needed, max 3 times daily"
-            })
-    
-    # Stomach issues
-    if any(s in symptoms for s in ['stomachpain', 'nausea', 'vomiting']):
-        medications.append({
-            "name": "Omeprazole 20mg",
-            "dosage": "1 capsule",
-            "duration": "7 days",
-            "instructions": "Take once daily before breakfast"
-        })
-    
-    # Default if nothing matched
-    if not medications:
-        medications = [{
-            "name": "Multivitamin",
-            "dosage": "1 tablet",
-            "duration": "30 days",
-            "instructions": "Take once daily with breakfast"
-        }]
-    
-    return {
-        "medications": medications,
-        "disclaimer": "AI-suggested prescription for educational review. Must be verified by supervising physician."
-    }
+    """Rule-based prescription from data/prescription_rules.json"""
+    return rule_engine.prescribe(symptoms, disease)
@@ -0,0 +1,127 @@
+import json
+from functools import lru_cache
+from typing import Dict, Iterable, NamedTuple, Tuple
+from ..config import settings
+from ..logger import get_logger
+from .symptoms import CANONICAL_SYMPTOMS
+
+logger = get_logger(__name__)
+
+
+class Rule(NamedTuple):
+    id: str
+    symptom_mask: int               # fires if any of these symptom bits is set
+    diseases: frozenset             # ...or the disease is one of these (lowercase)
+    disease_contains: Tuple[str, ...]  # ...or contains one of these (lowercase)
+    prescribe: Tuple[str, ...]      # medication ids
+
+
+class PrescriptionRuleEngine:
+    """
+    Rule-based prescriptions from data/prescription_rules.json.
+
+    load() compiles the table once: each canonical symptom gets a bit, each
+    rule a mask of the symptoms that trigger it, so matching a patient is one
+    AND per rule. Results are memoized per (symptom set, disease).
+    """
+    version = None
+    disclaimer = ""
+
+    def __init__(self):
+        self._bits: Dict[str, int] = {}
+        self._rules: Tuple[Rule, ...] = ()
+        self._medications: Dict[str, dict] = {}
+        self._default: Tuple[str, ...] = ()
+        self._match = None
+        self._disease_rules = None
+
+    def load(self, path: str = None):
+        """Reads and validates the rule table; raises ValueError on a bad table."""
+        path = path or settings.PRESCRIPTION_RULES_PATH
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+
+        bits = {symptom: 1 << i for i, symptom in enumerate(CANONICAL_SYMPTOMS)}
+        medications = table["medications"]
+        rules = []
+        for raw in table["rules"]:
+            unknown = [s for s in raw.get("symptoms_any", []) if s not in bits]
+            if unknown:
+                raise ValueError(f"Rule {raw['id']!r} uses unknown symptoms: {', '.join(unknown)}")
+            missing = [m for m in raw["prescribe"] if m not in medications]
+            if missing:
+                raise ValueError(f"Rule {raw['id']!r} prescribes unknown medications: {', '.join(missing)}")
+            mask = 0
+            for symptom in raw.get("symptoms_any", []):
+                mask |= bits[symptom]
+            rules.append(Rule(
+                id=raw["id"],
+                symptom_mask=mask,
+                diseases=frozenset(d.lower() for d in raw.get("diseases", [])),
+                disease_contains=tuple(d.lower() for d in raw.get("disease_contains", [])),
+                prescribe=tuple(raw["prescribe"]),
+            ))
+        default = tuple(table.get("default", []))
+        if any(m not in medications for m in default):
+            raise ValueError("Default prescription uses unknown medications")
+
+        self._bits = bits
+        self._rules = tuple(rules)
+        self._medications = medications
+        self._default = default
+        self.disclaimer = table.get("disclaimer", "")
+        self.version = table.get("version")
+        # Fresh caches, so a reload never serves results from the old table
+        self._match = lru_cache(maxsize=4096)(self._match_uncached)
+        self._disease_rules = lru_cache(maxsize=1024)(self._disease_rules_uncached)
+        logger.info("Prescription rules loaded", extra={"version": self.version, "rules": len(rules)})
+
+    def _ensure_loaded(self):
+        if self.version is None:
+            self.load()
+
+    def symptom_mask(self, symptoms: Iterable[str]) -> int:
+        mask = 0
+        for symptom in symptoms:
+            mask |= self._bits.get(symptom, 0)
+        return mask
+
+    def _disease_rules_uncached(self, disease: str) -> int:
+        """Bitmask of rules (by position) that fire on this lowercase disease"""
+        mask = 0
+        for i, rule in enumerate(self._rules):
+            if disease in rule.diseases or any(part in disease for part in rule.disease_contains):
+                mask |= 1 << i
+        return mask
+
+    def _match_uncached(self, symptom_mask: int, disease: str) -> Tuple[str, ...]:
+        disease_rules = self._disease_rules(disease)
+        chosen, ingredients = [], set()
+        for i, rule in enumerate(self._rules):
+            if not (rule.symptom_mask & symptom_mask or disease_rules >> i & 1):
+                continue
+            # First rule to prescribe an ingredient wins (e.g. one Paracetamol)
+            for med_id in rule.prescribe:
+                ingredient = self._medications[med_id].get("ingredient", med_id)
+                if ingredient not in ingredients:
+                    ingredients.add(ingredient)
+                    chosen.append(med_id)
+        return tuple(chosen) or self._default
+
+    def has_rule_for(self, disease: str) -> bool:
+        """True if some rule is written for this disease specifically"""
+        self._ensure_loaded()
+        return bool(self._disease_rules(disease.strip().lower()))
+
+    def prescribe(self, symptoms: Iterable[str], disease: str) -> dict:
+        self._ensure_loaded()
+        med_ids = self._match(self.symptom_mask(symptoms), (disease or "").strip().lower())
+        medications = []
+        for med_id in med_ids:
+            medication = dict(self._medications[med_id])
+            medication.pop("ingredient", None)
+            medications.append(medication)
+        return {"medications": medications, "disclaimer": self.disclaimer}
+
+
+rule_engine = PrescriptionRuleEngine()
@@ -0,0 +1,123 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+from pymongo import ReturnDocument
+from ..config import settings
+from ..logger import get_logger
+
+logger = get_logger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(spec: str) -> Tuple[float, float]:
+    """
+    "10/minute" (or "10/60") -> (tokens refilled per second, bucket size).
+    The bucket holds one period's worth, so short bursts up to N are allowed.
+    """
+    count, _, period = spec.partition("/")
+    seconds = _PERIODS.get(period.strip()) or float(period)
+    return float(count) / seconds, float(count)
+
+
+class RateLimitBackend(ABC):
+    """
+    Token-bucket storage. `take` refills the bucket for `key`, tries to
+    remove `cost` tokens and returns (allowed, seconds until enough tokens).
+    """
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        ...
+
+
+class InMemoryBackend(RateLimitBackend):
+    """Per-process buckets. Each worker enforces the limits on its own."""
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> (tokens, last refill, rate, burst)
+        self._buckets: Dict[str, Tuple[float, float, float, float]] = {}
+
+    async def take(self, key, rate, burst, cost=1.0):
+        # No awaits below, so this is atomic on the event loop
+        now = time.monotonic()
+        tokens, last, _, _ = self._buckets.get(key, (burst, now, rate, burst))
+        tokens = min(burst, tokens + (now - last) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        if key not in self._buckets and len(self._buckets) >= self.max_keys:
+            self._evict_full(now)
+        self._buckets[key] = (tokens, now, rate, burst)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def _evict_full(self, now: float):
+        # Buckets that have refilled completely carry no state worth keeping
+        for key in [k for k, (t, last, r, b) in self._buckets.items() if t + (now - last) * r >= b]:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.clear()
+
+
+class MongoBackend(RateLimitBackend):
+    """
+    Buckets shared by every worker, stored in the `rate_limits` collection.
+    Each take is a single atomic findOneAndUpdate with an update pipeline;
+    idle buckets are removed by a TTL index.
+    """
+    collection_name = "rate_limits"
+
+    def __init__(self):
+        self._indexed = False
+
+    async def _collection(self):
+        from ..database import mongo
+        collection = mongo.db[self.collection_name]
+        if not self._indexed:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexed = True
+        return collection
+
+    async def take(self, key, rate, burst, cost=1.0):
+        collection = await self._collection()
+        now = time.time()
+        idle_ms = int(burst / rate * 1000) + 60_000
+        doc = await collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {
+                    "tokens": {"$min": [burst, {"$add": [
+                        {"$ifNull": ["$tokens", burst]},
+                        {"$multiply": [{"$subtract": [now, {"$ifNull": ["$ts", now]}]}, rate]},
+                    ]}]},
+                    "ts": now,
+                }},
+                {"$set": {"allowed": {"$gte": ["$tokens", cost]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", cost]}, "$tokens"]},
+                    "expires_at": {"$add": ["$$NOW", idle_ms]},
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc["allowed"]:
+            return True, 0.0
+        return False, (cost - doc["tokens"]) / rate
+
+
+_backend: Optional[RateLimitBackend] = None
+
+
+def get_backend() -> RateLimitBackend:
+    """Backend selected by RATE_LIMIT_BACKEND ("memory" or "mongo")"""
+    global _backend
+    if _backend is None:
+        _backend = MongoBackend() if settings.RATE_LIMIT_BACKEND == "mongo" else InMemoryBackend()
+        logger.info("Rate limit backend ready", extra={"backend": type(_backend).__name__})
+    return _backend
+
+
+def set_backend(backend: RateLimitBackend):
+    """Plug in another shared store (e.g. Redis) implementing RateLimitBackend"""
+    global _backend
+    _backend = backend
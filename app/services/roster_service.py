@@ -0,0 +1,155 @@
+import base64
+import re
+import time
+from typing import Dict, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo import UpdateOne
+from ..config import settings
+from ..database import mongo
+from ..models import User, Consultation
+from ..logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _TTLCache:
+    """Small per-process cache; entries expire after `ttl` seconds"""
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[tuple, Tuple[float, dict]] = {}
+
+    def get(self, key: tuple) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[1]
+
+    def set(self, key: tuple, value: dict):
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        self._entries.clear()
+
+
+_cache = _TTLCache(settings.ROSTER_CACHE_SECONDS, settings.ROSTER_CACHE_MAX_ENTRIES)
+
+
+def invalidate():
+    """Drops cached roster pages in this worker (called when a patient signs up)"""
+    _cache.clear()
+
+
+def _sort_name(doc: dict) -> str:
+    return doc.get("username_lower") or doc["username"].lower()
+
+
+def _encode_cursor(doc: dict) -> str:
+    raw = f"{doc['_id']}|{_sort_name(doc)}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, ObjectId]:
+    try:
+        oid, _, name = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return name, ObjectId(oid)
+    except (ValueError, InvalidId, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def backfill_search_fields(batch_size: int = 500) -> int:
+    """
+    Startup migration: fills username_lower/email_lower for users written
+    before those fields existed, so the roster query sees every patient.
+    Only touches users missing the fields; returns how many were updated.
+    """
+    collection = mongo.db[User.Settings.name]
+    updated = 0
+    ops = []
+    async for doc in collection.find({"username_lower": {"$exists": False}}, {"username": 1, "email": 1}):
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {
+            "username_lower": doc["username"].lower(),
+            "email_lower": doc["email"].lower() if doc.get("email") else None,
+        }}))
+        if len(ops) >= batch_size:
+            await collection.bulk_write(ops, ordered=False)
+            updated += len(ops)
+            ops = []
+    if ops:
+        await collection.bulk_write(ops, ordered=False)
+        updated += len(ops)
+    if updated:
+        logger.info("Filled roster search fields", extra={"users": updated})
+        invalidate()
+    return updated
+
+
+async def _visit_stats(doctor_email: str, patient_emails: list) -> Dict[str, dict]:
+    """Consultation count and last visit with this doctor, per patient email"""
+    if not patient_emails:
+        return {}
+    pipeline = [
+        {"$match": {"doctor_email": doctor_email, "patient_email": {"$in": patient_emails}}},
+        {"$group": {
+            "_id": "$patient_email",
+            "consultations": {"$sum": 1},
+            "last_visit": {"$max": "$consultation_date"},
+        }},
+    ]
+    collection = mongo.read_collection(Consultation)
+    return {row["_id"]: row async for row in collection.aggregate(pipeline)}
+
+
+async def roster_page(doctor_email: str, q: Optional[str], limit: int, cursor: Optional[str]) -> dict:
+    """
+    One page of patients ordered by name (case-insensitive), with visit
+    counts for this doctor. `q` is a case-insensitive prefix of the username
+    or email, matched against the stored lowercase copies with an anchored
+    regex so it can use the role/username_lower and role/email_lower indexes.
+    """
+    key = (doctor_email, q, limit, cursor)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    query: dict = {"role": "patient"}
+    if q:
+        prefix = {"$regex": f"^{re.escape(q.lower())}"}
+        query["$or"] = [{"username_lower": prefix}, {"email_lower": prefix}]
+    if cursor:
+        last_name, last_id = _decode_cursor(cursor)
+        query["$and"] = [{"$or": [
+            {"username_lower": {"$gt": last_name}},
+            {"username_lower": last_name, "_id": {"$gt": last_id}},
+        ]}]
+
+    users = await mongo.read_collection(User).find(
+        query, {"username": 1, "username_lower": 1, "email": 1}
+    ).sort([("username_lower", 1), ("_id", 1)]).limit(limit + 1).to_list(limit + 1)
+
+    page = users[:limit]
+    stats = await _visit_stats(doctor_email, [u["email"] for u in page if u.get("email")])
+    patients = []
+    for u in page:
+        visits = stats.get(u.get("email"), {})
+        patients.append({
+            "id": str(u["_id"]),
+            "email": u.get("email"),
+            "name": u["username"],
+            "consultations": visits.get("consultations", 0),
+            "last_visit": visits.get("last_visit"),
+        })
+
+    result = {
+        "patients": patients,
+        "next_cursor": _encode_cursor(page[-1]) if len(users) > limit else None,
+    }
+    _cache.set(key, result)
+    return result
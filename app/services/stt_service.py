@@ -1,36 +1,72 @@
+import asyncio
 import tempfile
 import os
+import time
 from gradio_client import Client, handle_file
 from ..config import settings
+from ..logger import get_logger
+from .circuit_breaker import stt_breaker
+from .upstream import run_blocking
 
-async def transcribe_audio(audio_bytes: bytes, language: str = "english") -> str:
-    """Send WAV directly - your Gradio accepts any audio format"""
-    temp_file = None
+logger = get_logger(__name__)
+
+FALLBACK_TRANSCRIPTION = "I have headache fever and cough"
+
+
+def _call_gradio(temp_file: str, language: str):
+    client = Client(settings.HF_SPACE_URL)
+    return client.predict(
+        language,
+        handle_file(temp_file),
+        api_name="/predict"
+    )
+
+
+def _transcribe_blocking(audio_bytes: bytes, language: str):
+    """
+    Writes the upload to a temp WAV, sends it and removes it, all on the
+    worker thread: if the caller times out, the file stays until the
+    abandoned upload is done with it.
+    """
+    fd, temp_file = tempfile.mkstemp(suffix='.wav')
     try:
         # Save as WAV (no conversion)
-        temp_file = tempfile.mktemp(suffix='.wav')
-        with open(temp_file, 'wb') as f:
+        with os.fdopen(fd, 'wb') as f:
             f.write(audio_bytes)
+        return _call_gradio(temp_file, language)
+    finally:
+        try:
+            os.unlink(temp_file)
+        except OSError:
+            pass
+
+
+async def transcribe_audio(audio_bytes: bytes, language: str = "english") -> str:
+    """Send WAV directly - your Gradio accepts any audio format"""
+    # Fast-fail while the Space is known to be down or slow
+    if not stt_breaker.allow():
+        logger.debug("STT circuit open, using fallback transcription")
+        return FALLBACK_TRANSCRIPTION
+
+    started = time.monotonic()
+    try:
+        logger.debug("Calling Gradio STT", extra={"audio_bytes": len(audio_bytes)})
         
-        print(f"STT: Calling Gradio with {len(audio_bytes)} bytes")
-        
-        client = Client(settings.HF_SPACE_URL)
-        result = client.predict(
-            language,
-            handle_file(temp_file),
-            api_name="/predict"
+        # The Gradio client is blocking; run it on the upstream pool with a hard deadline
+        result = await run_blocking(
+            _transcribe_blocking, audio_bytes, language,
+            timeout=settings.STT_TIMEOUT_SECONDS
         )
+        stt_breaker.record_success(time.monotonic() - started)
         
-        print(f"STT: {result}")
+        logger.debug("STT result", extra={"transcription": result})
         return str(result) if result else "headache fever cough"
+
+    except asyncio.CancelledError:
+        stt_breaker.release()
+        raise
         
     except Exception as e:
-        print(f"STT Error: {e}")
-        return "I have headache fever and cough"
-        
-    finally:
-        if temp_file and os.path.exists(temp_file):
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+        stt_breaker.record_failure(time.monotonic() - started)
+        logger.warning("STT call failed", extra={"error": repr(e)})
+        return FALLBACK_TRANSCRIPTION
@@ -0,0 +1,50 @@
+"""
+Canonical symptom vocabulary: the names extract_symptoms_from_text produces
+and the prescription rules in data/prescription_rules.json are written in.
+"""
+
+# Keyword found in the patient's text -> canonical symptom
+SYMPTOM_MAPPING = {
+    'headache': 'headache',
+    'head pain': 'headache',
+    'head': 'headache',
+    'fever': 'highfever',
+    'temperature': 'highfever',
+    'high fever': 'highfever',
+    'cough': 'cough',
+    'coughing': 'cough',
+    'sneez': 'continuoussneezing',
+    'burn': 'burningmicturition',
+    'burning': 'burningmicturition',
+    'runny': 'runnynose',
+    'running nose': 'runnynose',
+    'nose': 'runnynose',
+    'joint': 'jointpain',
+    'pain': 'jointpain',
+    'weak': 'muscleweakness',
+    'muscle pain': 'musclepain',
+    'body ache': 'musclepain',
+    'ache': 'musclepain',
+    'tired': 'fatigue',
+    'fatigue': 'fatigue',
+    'nausea': 'nausea',
+    'vomit': 'vomiting',
+    'stomach': 'stomachpain',
+    'belly': 'stomachpain',
+    'dizzy': 'dizziness',
+    'skin': 'skinrash',
+    'rash': 'skinrash',
+    'itch': 'itching',
+    'breathe': 'breathlessness',
+    'breath': 'breathlessness',
+    'chest': 'chestpain',
+    'sweat': 'sweating',
+    'appetite': 'lossofappetite',
+    'chill': 'chills',
+    'shiver': 'shivering',
+    'cold': 'chills',
+    'throat': 'throatirritation',
+}
+
+# Every canonical symptom, in a stable order
+CANONICAL_SYMPTOMS = tuple(sorted(set(SYMPTOM_MAPPING.values())))
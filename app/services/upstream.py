@@ -0,0 +1,23 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from ..config import settings
+
+# Blocking upstream clients (Groq, Gradio STT) run here rather than in the
+# loop's default executor. A call that outlives its timeout keeps its thread
+# until the client gives up, so a hung upstream can use at most this pool
+# and never starves other asyncio.to_thread users.
+_executor = ThreadPoolExecutor(max_workers=settings.UPSTREAM_MAX_THREADS, thread_name_prefix="upstream")
+
+
+async def run_blocking(func, *args, timeout: float, **kwargs):
+    """
+    Runs `func` on the upstream pool and waits at most `timeout` seconds
+    (asyncio.TimeoutError after that). Calls still queued when the pool is
+    full count against the same deadline. Context variables (the request
+    ID) are carried into the thread, as with asyncio.to_thread.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await asyncio.wait_for(loop.run_in_executor(_executor, call), timeout)
@@ -0,0 +1,94 @@
+"""
+Shared helpers for the benchmark suite: environment defaults, latency
+statistics and the machine-readable result file.
+"""
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Settings() is built at import time, so these must be in place before
+# anything under `app` is imported.
+BENCH_ENV_DEFAULTS = {
+    "MONGO_URI": "mongodb://127.0.0.1:27017/symptom_bench",
+    "GEMINI_API_KEY": "bench",
+    "HF_SPACE_URL": "http://127.0.0.1:7860",
+    "JWT_SECRET_KEY": "bench-secret",
+    "JWT_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+    # Measure the pipeline, not 429s from admission control
+    "RATE_LIMIT_ENABLED": "false",
+}
+
+
+def configure_env():
+    for key, value in BENCH_ENV_DEFAULTS.items():
+        os.environ.setdefault(key, value)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile over an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def summarize(latencies_s: List[float], elapsed_s: float, errors: int = 0) -> Dict[str, float]:
+    """Turns raw per-call latencies (seconds) into the reported stats (ms)."""
+    ordered = sorted(latencies_s)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_per_s": round(count / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def write_results(path: str, suite: str, config: dict, results: Dict[str, dict]):
+    """
+    Writes results as stable, key-sorted JSON so two runs can be compared
+    with `python -m benchmarks.compare old.json new.json` or a plain diff.
+    """
+    payload = {
+        "suite": suite,
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": config,
+        "results": results,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Benchmark results written to {path}")
+
+
+def print_table(results: Dict[str, dict]):
+    print(f"{'case':<28}{'n':>8}{'err':>6}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in results.items():
+        print(
+            f"{name:<28}{r['requests']:>8}{r['errors']:>6}{r['throughput_per_s']:>12}"
+            f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}"
+        )
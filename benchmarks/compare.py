@@ -0,0 +1,46 @@
+"""
+Compares two benchmark result files case by case.
+
+    python -m benchmarks.compare old.json new.json
+"""
+import argparse
+import json
+
+METRICS = ["throughput_per_s", "p50_ms", "p95_ms", "p99_ms"]
+
+
+def _delta(old: float, new: float) -> str:
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        old = json.load(f)
+    with open(args.candidate) as f:
+        new = json.load(f)
+
+    print(f"baseline {old.get('commit')}  ->  candidate {new.get('commit')}")
+    header = f"{'case':<28}" + "".join(f"{m:>26}" for m in METRICS)
+    print(header)
+    for case in sorted(set(old["results"]) | set(new["results"])):
+        a, b = old["results"].get(case), new["results"].get(case)
+        if a is None or b is None:
+            print(f"{case:<28}{'only in ' + ('candidate' if a is None else 'baseline'):>26}")
+            continue
+        if not all(m in a and m in b for m in METRICS):
+            # Not a latency case (e.g. storage sizes): show both values
+            print(f"{case:<28}  {a} -> {b}")
+            continue
+        cells = "".join(f"{f'{a[m]} -> {b[m]} ({_delta(a[m], b[m])})':>26}" for m in METRICS)
+        print(f"{case:<28}{cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+End-to-end load harness for the HTTP API.
+
+By default everything runs in this process and offline: the FastAPI app is
+driven through httpx's ASGI transport, Mongo is mongomock-motor, Groq is the
+local stub server and STT is the fake Gradio client (see benchmarks/stubs.py).
+
+    python -m benchmarks.load --concurrency 16 --requests 400
+    python -m benchmarks.load --mongo-uri mongodb://127.0.0.1:27017/symptom_bench
+    python -m benchmarks.load --base-url http://127.0.0.1:8000   # against a running uvicorn
+
+With --base-url the server's own upstreams are used; start it with
+GROQ_BASE_URL pointing at `python -m benchmarks.stubs` to stay offline.
+
+The read scenarios (history, patient/doctor consultations) time queries over
+--seed-records analyses and consultations per patient, inserted directly
+before the run. History writes from /api/analyze can fail validation when the
+LLM/keyword path returns predictions without precautions, so the analyze
+scenarios alone would leave those collections near-empty. With --base-url
+nothing is seeded: only compare read numbers from runs against the same data.
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List
+
+from .common import configure_env, print_table, summarize, write_results
+
+SCENARIOS = [
+    "login",
+    "analyze_text",
+    "analyze_audio",
+    "history",
+    "patient_consultations",
+    "doctor_consultations",
+    "doctor_patients",
+]
+
+# analyze_symptoms files every consultation under this doctor
+DOCTOR_EMAIL = "doc@example.com"
+PASSWORD = "bench-password"
+
+
+async def run_scenario(
+    call: Callable[[int], Awaitable[int]], total: int, concurrency: int
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                status = await call(i)
+            except Exception:
+                status = 599
+            latencies.append(time.perf_counter() - t0)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def start_in_process(args):
+    """Wires the app to local stand-ins and returns an ASGI-backed client."""
+    import httpx
+    from .stubs import StubGroqServer, ensure_model, install_fake_stt, mongo_client
+
+    groq = StubGroqServer(latency_ms=args.groq_latency_ms).start()
+    os.environ["GROQ_API_KEY"] = "bench"
+    os.environ["GROQ_BASE_URL"] = groq.base_url
+
+    from app.database import mongo
+    from app.logger import setup_logging
+    from app.main import app
+    from app.services.auditor_service import auditor
+
+    setup_logging()
+    install_fake_stt(latency_ms=args.stt_latency_ms)
+    client = mongo_client(args.mongo_uri or os.environ["MONGO_URI"], real=bool(args.mongo_uri))
+    await client.drop_database(client.get_database().name)
+    await mongo.connect(client=client)
+    ensure_model(auditor)
+
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    async def stop():
+        groq.stop()
+        await mongo.close()
+    return http, stop
+
+
+async def seed_records(seeded, per_patient: int, seed_value: int = 7):
+    """Inserts realistic analysis history and consultations for every patient"""
+    import random
+    from datetime import datetime, timedelta
+    from app.database import mongo
+    from app.services.auditor_service import auditor
+    from app.services.disease_catalog import catalog
+
+    rng = random.Random(seed_value)
+    columns = list(auditor.symptom_columns)
+    start = datetime.now() - timedelta(days=per_patient)
+    history, consultations = [], []
+    for username, email in zip(seeded["patient_names"], seeded["patient_emails"]):
+        symptom_lists = [rng.sample(columns, rng.randint(2, 5)) for _ in range(per_patient)]
+        for i, (symptoms, result) in enumerate(zip(symptom_lists, auditor.predict_batch(symptom_lists))):
+            full = result.model_dump()
+            top = full["predictions"][0] if full["predictions"] else {"disease": "Unknown", "probability": "N/A"}
+            transcription = f"I have {', '.join(s.replace('_', ' ') for s in symptoms)}"
+            summary = f"Based on your symptoms, our analysis suggests {top['disease']}. Please consult a healthcare provider."
+            # Stored the way the app writes them today (compact predictions)
+            history.append({
+                "user_uid": username, "raw_transcription": transcription, "llm_symptoms": symptoms,
+                "ml_results": catalog.compact(full), "llm_final_summary": summary,
+            })
+            consultations.append({
+                "patient_email": email, "patient_name": username,
+                "doctor_email": DOCTOR_EMAIL, "doctor_name": "Dr. Bench",
+                "transcription": transcription, "symptoms": symptoms,
+                "diagnosis": top["disease"], "diagnosis_confidence": top["probability"], "summary": summary,
+                "medications": [{"name": "Paracetamol", "dosage": "500mg", "duration": "3 days", "instructions": "After meals"}],
+                "precautions": ["rest", "fluids"], "ml_predictions": catalog.compact(full),
+                "followup_date": None, "followup_time": None,
+                "consultation_date": start + timedelta(days=i), "status": "completed",
+            })
+    if history:
+        await mongo.db["analysis_history"].insert_many(history)
+        await mongo.db["consultations"].insert_many(consultations)
+
+
+async def seed_users(http, patients: int) -> Dict[str, object]:
+    run_id = uuid.uuid4().hex[:8]
+    users = [(f"bench-doc-{run_id}", DOCTOR_EMAIL, "doctor")]
+    users += [(f"bench-pt-{run_id}-{i}", f"pt{i}-{run_id}@example.com", "patient") for i in range(patients)]
+    tokens = {}
+    for username, email, role in users:
+        r = await http.post("/api/auth/signup", json={
+            "username": username, "email": email, "role": role, "password": PASSWORD,
+        })
+        r.raise_for_status()
+        r = await http.post("/api/auth/login", data={"username": username, "password": PASSWORD})
+        r.raise_for_status()
+        tokens[username] = r.json()["access_token"]
+    names = [u[0] for u in users]
+    return {
+        "doctor": tokens[names[0]],
+        "patients": [tokens[n] for n in names[1:]],
+        "patient_names": names[1:],
+        "patient_emails": [u[1] for u in users[1:]],
+    }
+
+
+def build_calls(http, seeded, audio: bytes) -> Dict[str, Callable[[int], Awaitable[int]]]:
+    patients = seeded["patients"]
+    doctor = {"Authorization": f"Bearer {seeded['doctor']}"}
+
+    def patient(i):
+        return {"Authorization": f"Bearer {patients[i % len(patients)]}"}
+
+    async def login(i):
+        name = seeded["patient_names"][i % len(patients)]
+        r = await http.post("/api/auth/login", data={"username": name, "password": PASSWORD})
+        return r.status_code
+
+    async def analyze_text(i):
+        r = await http.post("/api/analyze", headers=patient(i), data={
+            "text": "I have a headache, high fever and a cough with a runny nose",
+        })
+        return r.status_code
+
+    async def analyze_audio(i):
+        r = await http.post("/api/analyze", headers=patient(i), files={
+            "audio_file": ("sample.wav", audio, "audio/wav"),
+        })
+        return r.status_code
+
+    def get(path, headers):
+        async def call(i):
+            r = await http.get(path, headers=headers(i))
+            return r.status_code
+        return call
+
+    return {
+        "login": login,
+        "analyze_text": analyze_text,
+        "analyze_audio": analyze_audio,
+        "history": get("/api/history", patient),
+        "patient_consultations": get("/api/patient/my-consultations", patient),
+        "doctor_consultations": get("/api/doctor/my-consultations", lambda i: doctor),
+        "doctor_patients": get("/api/doctor/patients", lambda i: doctor),
+    }
+
+
+async def run(args) -> Dict[str, dict]:
+    if args.base_url:
+        import httpx
+        http = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+
+        async def stop():
+            pass
+    else:
+        http, stop = await start_in_process(args)
+
+    try:
+        seeded = await seed_users(http, args.patients)
+        if not args.base_url and args.seed_records:
+            await seed_records(seeded, args.seed_records)
+        # A short, silent WAV-sized payload; the fake STT ignores the content
+        audio = b"RIFF" + b"\x00" * (args.audio_kb * 1024)
+        calls = build_calls(http, seeded, audio)
+        results = {}
+        for name in SCENARIOS:
+            if args.only and name not in args.only:
+                continue
+            total = args.login_requests if name == "login" else args.requests
+            results[name] = await run_scenario(calls[name], total, args.concurrency)
+        return results
+    finally:
+        await http.aclose()
+        await stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the end-to-end load harness.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=40, help="Login is bcrypt-bound; keep it short")
+    parser.add_argument("--patients", type=int, default=8)
+    parser.add_argument("--seed-records", type=int, default=50,
+                        help="Analyses and consultations inserted per patient before the run (in-process only)")
+    parser.add_argument("--audio-kb", type=int, default=64)
+    parser.add_argument("--groq-latency-ms", type=float, default=0.0)
+    parser.add_argument("--stt-latency-ms", type=float, default=0.0)
+    parser.add_argument("--mongo-uri", help="Use a local mongod instead of mongomock (the database is dropped)")
+    parser.add_argument("--base-url", help="Load test a running server instead of the in-process app")
+    parser.add_argument("--only", nargs="*", choices=SCENARIOS)
+    parser.add_argument("--output", default="benchmarks/results/load.json")
+    args = parser.parse_args()
+
+    configure_env()
+    results = asyncio.run(run(args))
+    print_table(results)
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "base_url", "mongo_uri")}
+    config["target"] = "remote" if args.base_url else ("mongod" if args.mongo_uri else "mongomock")
+    write_results(args.output, "load", config, results)
+
+
+if __name__ == "__main__":
+    main()
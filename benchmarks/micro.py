@@ -0,0 +1,171 @@
+"""
+Microbenchmarks for the CPU-bound pieces of the /api/analyze pipeline.
+
+    python -m benchmarks.micro --iterations 2000 --output benchmarks/results/micro.json
+
+Output printed by the code under test is discarded while timing, so the
+numbers include the cost of those writes but not of a terminal.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from .common import configure_env, print_table, summarize, write_results
+
+SAMPLE_TEXTS = [
+    "I have headache and fever",
+    "I have a headache, high fever and a cough with a runny nose",
+    "My stomach hurts, I feel nausea and I vomited twice since yesterday evening",
+    "Skin rash with itching on my arms, and I feel tired and weak all the time",
+    "Chest pain when I breathe, sweating at night, chills and loss of appetite",
+]
+
+
+def run_case(fn: Callable[[int], object], iterations: int, warmup: int) -> Dict[str, float]:
+    sink = io.StringIO()
+    latencies: List[float] = []
+    with contextlib.redirect_stdout(sink):
+        for i in range(warmup):
+            fn(i)
+        started = time.perf_counter()
+        for i in range(iterations):
+            t0 = time.perf_counter()
+            fn(i)
+            latencies.append(time.perf_counter() - t0)
+            if sink.tell() > 1 << 20:
+                sink.seek(0)
+                sink.truncate()
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed)
+
+
+def sample_consultations(count: int) -> List[dict]:
+    """Raw consultation documents shaped like the ones analyze_symptoms stores"""
+    from bson import ObjectId
+
+    prediction = {
+        "disease": "Common Cold",
+        "probability": "72.00%",
+        "description": "The common cold is a viral infection of your nose and throat (upper respiratory tract). "
+                       "It's usually harmless, although it might not feel that way.",
+        "precautions": {"precaution_1": "drink vitamin c rich drinks", "precaution_2": "take vapour",
+                        "precaution_3": "avoid cold food", "precaution_4": "keep fever in check"},
+    }
+    medication = {"name": "Paracetamol 500mg", "dosage": "1 tablet", "duration": "5 days",
+                  "instructions": "Take twice daily after meals"}
+    now = datetime(2026, 1, 1, 9, 30)
+    return [{
+        "_id": ObjectId(),
+        "patient_email": f"patient{i % 50}@example.com",
+        "patient_name": f"patient{i % 50}",
+        "doctor_email": "doc@example.com",
+        "doctor_name": "Dr. Rajesh Verma",
+        "transcription": SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)],
+        "symptoms": ["headache", "highfever", "cough", "runnynose"],
+        "diagnosis": "Common Cold",
+        "diagnosis_confidence": "72.00%",
+        "summary": "Based on your symptoms, our analysis suggests a 72.00% probability of Common Cold. " * 2,
+        "medications": [medication] * 3,
+        "precautions": list(prediction["precautions"].values()),
+        "ml_predictions": {"predictions": [prediction] * 3},
+        "followup_date": None,
+        "followup_time": None,
+        "consultation_date": now - timedelta(hours=i),
+        "status": "completed",
+    } for i in range(count)]
+
+
+def build_serialization_cases(docs: int) -> Dict[str, Callable[[int], object]]:
+    """
+    The doctor/patient consultation list before and after the raw path:
+    Beanie parse + response_model validation + stdlib json, versus orjson
+    straight from the Motor documents.
+    """
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from app.database import mongo
+    from app.models import Consultation
+    from app.responses import FastJSONResponse
+    from .stubs import mongo_client
+
+    asyncio.run(mongo.connect(client=mongo_client("mongodb://127.0.0.1/symptom_bench")))
+    raw = sample_consultations(docs)
+    adapter = TypeAdapter(List[Consultation])
+
+    def pydantic_path(i):
+        parsed = [Consultation.model_validate(d) for d in raw]
+        payload = adapter.dump_python(adapter.validate_python(parsed), mode="json", by_alias=True)
+        return JSONResponse(payload).body
+
+    def orjson_path(i):
+        return FastJSONResponse(raw).body
+
+    return {
+        f"consultations_{docs}_pydantic": pydantic_path,
+        f"consultations_{docs}_orjson": orjson_path,
+    }
+
+
+def build_cases() -> Dict[str, Callable[[int], object]]:
+    from jose import jwt
+    from app.auth import create_access_token
+    from app.config import settings
+    from app.services import llm_service
+    from app.services.auditor_service import auditor
+    from .stubs import ensure_model
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ensure_model(auditor)
+        symptom_sets = [llm_service.extract_symptoms_from_text(t) for t in SAMPLE_TEXTS]
+    # The auditor's columns use the dataset's snake_case names
+    column_sets = [list(auditor.symptom_columns[i * 7:i * 7 + 4]) for i in range(len(SAMPLE_TEXTS))]
+    diseases = ["Common Cold", "Typhoid", "Gastroenteritis", "Fungal infection", "Dengue"]
+    tokens = [create_access_token({"sub": f"user{i}"}) for i in range(len(SAMPLE_TEXTS))]
+
+    def decode(i):
+        return jwt.decode(tokens[i % len(tokens)], settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+    return {
+        "extract_symptoms_from_text": lambda i: llm_service.extract_symptoms_from_text(SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]),
+        "auditor_predict": lambda i: auditor.predict(column_sets[i % len(column_sets)]),
+        "rule_based_prescription": lambda i: llm_service.generate_rule_based_prescription(
+            symptom_sets[i % len(symptom_sets)], diseases[i % len(diseases)]
+        ),
+        "jwt_encode": lambda i: create_access_token({"sub": f"user{i}"}),
+        "jwt_decode": decode,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the microbenchmark suite.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--docs", type=int, default=300, help="Documents per serialization case")
+    parser.add_argument("--only", nargs="*", help="Run only these cases")
+    parser.add_argument("--output", default="benchmarks/results/micro.json")
+    args = parser.parse_args()
+
+    configure_env()
+    cases = build_cases()
+    cases.update(build_serialization_cases(args.docs))
+    results = {}
+    for name, fn in cases.items():
+        if args.only and name not in args.only:
+            continue
+        # The model and the list serializations are far slower than the rest;
+        # keep their run time comparable
+        slow = name == "auditor_predict" or name.startswith("consultations_")
+        iterations = max(50, args.iterations // 10) if slow else args.iterations
+        results[name] = run_case(fn, iterations, args.warmup)
+
+    print_table(results)
+    config = {"iterations": args.iterations, "warmup": args.warmup, "docs": args.docs}
+    write_results(args.output, "micro", config, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Storage size and read latency of stored ML predictions, in the full
+(legacy) form and after `app.cli.migrate_compact`.
+
+    python -m benchmarks.storage --docs 2000 --reads 200
+    python -m benchmarks.storage --mongo-uri mongodb://127.0.0.1:27017/symptom_bench
+
+Seeds consultations and analysis history with real auditor output in the
+full form, measures, migrates both collections, then measures again.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import bson
+
+from .common import configure_env, print_table, summarize, write_results
+
+PAGE = 50
+
+
+async def seed(docs: int, seed_value: int = 7):
+    from app.database import mongo
+    from app.services.auditor_service import auditor
+
+    rng = random.Random(seed_value)
+    columns = list(auditor.symptom_columns)
+    predictions = auditor.predict_batch([rng.sample(columns, rng.randint(2, 5)) for _ in range(docs)])
+    start = datetime(2025, 1, 1)
+    consultations, history = [], []
+    for i, result in enumerate(predictions):
+        full = result.model_dump()
+        top = full["predictions"][0] if full["predictions"] else {"disease": "Unknown", "probability": "N/A"}
+        consultations.append({
+            "patient_email": "bench@example.com", "patient_name": "bench",
+            "doctor_email": "doc@example.com", "doctor_name": "Dr. Bench",
+            "transcription": "I have headache and fever since yesterday", "symptoms": ["headache", "highfever"],
+            "diagnosis": top["disease"], "diagnosis_confidence": top["probability"], "summary": "Summary text.",
+            "medications": [], "precautions": [], "ml_predictions": full,
+            "followup_date": None, "followup_time": None,
+            "consultation_date": start + timedelta(minutes=i), "status": "completed",
+        })
+        history.append({
+            "user_uid": "bench", "raw_transcription": "I have headache and fever since yesterday",
+            "llm_symptoms": ["headache", "highfever"], "ml_results": full, "llm_final_summary": "Summary text.",
+        })
+    # Raw inserts: the legacy full form, as existing documents are stored
+    await mongo.db["consultations"].insert_many(consultations)
+    await mongo.db["analysis_history"].insert_many(history)
+
+
+async def average_size(collection_name: str) -> float:
+    from app.database import mongo
+
+    sizes = [len(bson.encode(doc)) async for doc in mongo.db[collection_name].find({})]
+    return sum(sizes) / len(sizes) if sizes else 0.0
+
+
+async def time_reads(reads: int) -> Dict[str, dict]:
+    from app.database import mongo
+    from app.models import AnalysisResult, Consultation
+
+    cases = {
+        "consultations_raw": lambda: mongo.read_documents(
+            Consultation, {"patient_email": "bench@example.com"}, sort=[("consultation_date", -1)], limit=PAGE),
+        "consultations_beanie": lambda: Consultation.find(
+            Consultation.patient_email == "bench@example.com").sort(-Consultation.consultation_date).limit(PAGE).to_list(),
+        "history_raw": lambda: mongo.read_documents(AnalysisResult, {"user_uid": "bench"}, limit=PAGE),
+    }
+    results = {}
+    for name, call in cases.items():
+        await call()  # warm up
+        latencies: List[float] = []
+        started = time.perf_counter()
+        for _ in range(reads):
+            t0 = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - t0)
+        results[name] = summarize(latencies, time.perf_counter() - started)
+    return results
+
+
+async def run(args):
+    from app.database import mongo
+    from app.cli.migrate_compact import migrate
+    from app.services.auditor_service import auditor
+    from benchmarks.stubs import ensure_model, mongo_client
+
+    await mongo.connect(client=mongo_client(args.mongo_uri or "mongodb://127.0.0.1:27017/symptom_bench", real=bool(args.mongo_uri)))
+    try:
+        await mongo.client.drop_database(mongo.db.name)
+        await mongo.connect(client=mongo.client)  # recreate indexes
+        ensure_model(auditor)
+        await seed(args.docs)
+
+        sizes, results = {}, {}
+        for phase in ("full", "compact"):
+            if phase == "compact":
+                for name in ("consultations", "analysis_history"):
+                    await migrate(name)
+            for name in ("consultations", "analysis_history"):
+                sizes[f"{name}_{phase}_avg_bytes"] = round(await average_size(name), 1)
+            for name, stats in (await time_reads(args.reads)).items():
+                results[f"{name}_{phase}"] = stats
+        return sizes, results
+    finally:
+        await mongo.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure storage size and read latency, full vs compact predictions.")
+    parser.add_argument("--docs", type=int, default=2000, help="Documents per collection")
+    parser.add_argument("--reads", type=int, default=200, help="Timed reads of one 50-document page per case")
+    parser.add_argument("--mongo-uri", help="Use a local mongod instead of mongomock (the database is dropped)")
+    parser.add_argument("--output", default="benchmarks/results/storage.json")
+    args = parser.parse_args()
+
+    configure_env()
+    sizes, results = asyncio.run(run(args))
+    for name, value in sizes.items():
+        print(f"{name:<40}{value:>10}")
+    print_table(results)
+    config = {"docs": args.docs, "reads": args.reads, "page": PAGE, "mongo": "real" if args.mongo_uri else "mongomock"}
+    write_results(args.output, "storage", config, {**results, "sizes": sizes})
+
+
+if __name__ == "__main__":
+    main()
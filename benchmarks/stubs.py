@@ -0,0 +1,172 @@
+"""
+Local stand-ins for everything /api/analyze talks to, so the benchmarks run
+offline and produce numbers that only depend on our own code.
+
+- StubGroqServer: a tiny OpenAI-compatible HTTP server. The Groq SDK reads
+  GROQ_BASE_URL, so pointing it here needs no change in the app.
+- FakeGradioClient: replaces gradio_client.Client inside stt_service. The real
+  client negotiates Gradio's config/queue/SSE protocol, which changes between
+  gradio releases; the fake keeps the call shape (`Client(url).predict(...)`)
+  and simulates the Space's latency instead.
+- mongo_client(): mongomock-motor in process, or a real local mongod.
+- ensure_model(): fits a small stand-in ExtraTrees model when
+  models/ExtraTrees.pkl is not present, so AuditorService.predict does real work.
+
+Run `python -m benchmarks.stubs --groq-port 8001` to serve the Groq stub on its
+own when load testing a separately started uvicorn.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREDICTION_REPLY = {
+    "predictions": [
+        {"disease": "Common Cold", "probability": "72%", "description": "Viral infection of the upper respiratory tract."},
+        {"disease": "Allergy", "probability": "18%", "description": "Immune response to a foreign substance."},
+        {"disease": "Pneumonia", "probability": "10%", "description": "Infection that inflames the air sacs in the lungs."},
+    ]
+}
+
+PRESCRIPTION_REPLY = {
+    "medications": [
+        {"name": "Paracetamol 500mg", "dosage": "1 tablet", "duration": "5 days", "instructions": "Take twice daily after meals"},
+        {"name": "Cetirizine 10mg", "dosage": "1 tablet", "duration": "5 days", "instructions": "Take once daily at bedtime"},
+    ],
+    "disclaimer": "AI-generated suggestion for educational review only",
+}
+
+
+class StubGroqServer:
+    """OpenAI-compatible chat completions stub, served from a daemon thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0, error_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests += 1
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms / 1000)
+                if not self.path.endswith("/chat/completions") or random.random() < stub.error_rate:
+                    self._reply(500, {"error": {"message": "stub failure", "type": "server_error"}})
+                    return
+                prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+                reply = PRESCRIPTION_REPLY if "medications" in prompt else PREDICTION_REPLY
+                self._reply(200, {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": json.dumps(reply)},
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+
+            def _reply(self, status: int, payload: dict):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubGroqServer":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeGradioClient:
+    """Drop-in for gradio_client.Client as used by stt_service."""
+
+    latency_ms: float = 0.0
+    transcription: str = "I have a headache, high fever and a cough with a runny nose"
+
+    def __init__(self, src: str, *args, **kwargs):
+        self.src = src
+
+    def predict(self, *args, api_name: str = None, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self.transcription
+
+
+def install_fake_stt(latency_ms: float = 0.0):
+    from app.services import stt_service
+
+    FakeGradioClient.latency_ms = latency_ms
+    stt_service.Client = FakeGradioClient
+    stt_service.handle_file = lambda path: path
+
+
+def mongo_client(uri: str, real: bool = False):
+    """A Motor client for a local mongod when `real`, otherwise an in-process mongomock one."""
+    if real:
+        import motor.motor_asyncio
+        return motor.motor_asyncio.AsyncIOMotorClient(uri)
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit(
+            "No --mongo-uri given and mongomock-motor is not installed. "
+            "Either `pip install mongomock-motor` or point the benchmark at a local mongod."
+        )
+    # The URI only names the default database here
+    return AsyncMongoMockClient(uri)
+
+
+def ensure_model(auditor, seed: int = 7):
+    """Loads the auditor, fitting a stand-in classifier if the real one is missing."""
+    if auditor.model is None:
+        auditor.load_model()
+    if auditor.model is not None:
+        return
+    import numpy as np
+    from sklearn.ensemble import ExtraTreesClassifier
+
+    rng = np.random.default_rng(seed)
+    n_classes = len(auditor.label_encoder.classes_)
+    n_features = len(auditor.symptom_columns)
+    X = (rng.random((n_classes * 40, n_features)) < 0.04) * rng.integers(1, 7, (n_classes * 40, n_features))
+    y = np.repeat(np.arange(n_classes), 40)
+    auditor.model = ExtraTreesClassifier(n_estimators=100, random_state=seed).fit(X, y)
+    print("Using stand-in ExtraTrees model (models/ExtraTrees.pkl not found).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the Groq stub for out-of-process load tests.")
+    parser.add_argument("--groq-port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = StubGroqServer(port=args.groq_port, latency_ms=args.latency_ms, error_rate=args.error_rate)
+    print(f"Groq stub listening on {server.base_url} (export GROQ_BASE_URL={server.base_url})")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.server.server_close()
@@ -0,0 +1,39 @@
+"""
+Shared setup for the test suite. Settings() is built when `app` is first
+imported, so the environment is filled in here, before any test module
+imports it. Paths such as data/*.csv are relative to the repo root.
+"""
+import asyncio
+import os
+import uuid
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for key, value in {
+    "MONGO_URI": "mongodb://127.0.0.1:27017/symptom_test",
+    "GEMINI_API_KEY": "test",
+    "HF_SPACE_URL": "http://127.0.0.1:7860",
+    "JWT_SECRET_KEY": "test-secret",
+    "JWT_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+    "LOG_LEVEL": "WARNING",
+}.items():
+    os.environ.setdefault(key, value)
+os.chdir(ROOT)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def mongo_db():
+    """A fresh in-process mongomock database with Beanie initialised on it"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from app.database import mongo
+
+    client = mongomock_motor.AsyncMongoMockClient(f"mongodb://127.0.0.1:27017/test_{uuid.uuid4().hex[:8]}")
+    run(mongo.connect(client=client))
+    yield mongo.db
+    run(mongo.close())
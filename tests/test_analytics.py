@@ -0,0 +1,72 @@
+from datetime import date, datetime, timedelta
+from app.models import Consultation
+from app.services import analytics_service
+from conftest import run
+
+
+def consultation(day: datetime, diagnosis="Migraine", symptoms=("headache", "nausea"), doctor="doc@example.com"):
+    return Consultation(
+        patient_email="pt@example.com", patient_name="pt", doctor_email=doctor,
+        transcription="t", symptoms=list(symptoms), diagnosis=diagnosis, diagnosis_confidence="50%",
+        summary="s", consultation_date=day,
+    )
+
+
+def rollup(doctor, day):
+    return run(analytics_service._collection().find_one({"doctor_email": doctor, "day": day}, {"_id": 0}))
+
+
+def all_rollups():
+    docs = run(analytics_service._collection().find({}, {"_id": 0}).to_list(None))
+    # $inc upserts only create the counters they touch
+    return {(d["doctor_email"], d["day"]): {"followups": 0, **d} for d in docs}
+
+
+def test_record_consultation_increments(mongo_db):
+    day = datetime(2025, 1, 2, 10, 30)
+    run(analytics_service.record_consultation(consultation(day)))
+    run(analytics_service.record_consultation(consultation(day, diagnosis="", symptoms=("headache", "headache", ""))))
+    row = rollup("doc@example.com", "2025-01-02")
+    assert row["consultations"] == 2
+    assert row["diagnoses"] == {"Migraine": 1, analytics_service._diagnosis_key(""): 1}
+    # Repeated symptoms in one consultation count once; empty ones are dropped
+    assert row["symptoms"] == {"headache": 2, "nausea": 1}
+
+
+def test_dotted_keys_are_escaped(mongo_db):
+    run(analytics_service.record_consultation(consultation(datetime(2025, 1, 2), diagnosis="Dr. House's $syndrome")))
+    row = rollup("doc@example.com", "2025-01-02")
+    (stored,) = row["diagnoses"]
+    assert "." not in stored and not stored.startswith("$")
+    assert analytics_service.unescape_key(stored) == "Dr. House's $syndrome"
+
+
+def test_backfill_matches_incremental_counts(mongo_db):
+    base = datetime.combine(date.today() - timedelta(days=5), datetime.min.time())
+    consultations = [
+        consultation(base + timedelta(hours=9)),
+        consultation(base + timedelta(hours=15), diagnosis="Flu", symptoms=("cough",)),
+        consultation(base + timedelta(days=1, hours=9), doctor="other@example.com"),
+    ]
+    for c in consultations:
+        run(c.insert())
+        run(analytics_service.record_consultation(c))
+    live = all_rollups()
+
+    assert run(analytics_service.backfill(batch_size=1)) == 2
+    assert all_rollups() == live
+
+
+def test_backfill_leaves_today_and_removes_stale_days(mongo_db):
+    today = datetime.now()
+    run(analytics_service.record_consultation(consultation(today)))
+    gone = date.today() - timedelta(days=3)
+    run(analytics_service._collection().insert_one(
+        {"doctor_email": "doc@example.com", "day": gone.isoformat(), "consultations": 4, "followups": 0,
+         "diagnoses": {}, "symptoms": {}}
+    ))
+
+    # No consultations are stored, so a rebuild of today would wipe its $inc counters
+    assert run(analytics_service.backfill(end=date.today())) == 0
+    assert rollup("doc@example.com", analytics_service.day_of(today))["consultations"] == 1
+    assert rollup("doc@example.com", gone.isoformat()) is None
@@ -0,0 +1,96 @@
+import pytest
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+def make_breaker(**overrides):
+    options = dict(slow_call_seconds=1.0, window_seconds=60, min_calls=4,
+                   failure_rate_threshold=0.5, slow_call_rate_threshold=0.5, open_seconds=30, half_open_probes=1)
+    options.update(overrides)
+    return CircuitBreaker("test", **options)
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.min_calls):
+        assert breaker.allow()
+        breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(breaker.min_calls - 1):
+        breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_opens_on_failure_rate_and_refuses_calls(clock):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    assert not breaker.allow()
+    assert breaker.snapshot()["counters"]["short_circuited"] == 1
+
+
+def test_opens_on_slow_calls(clock):
+    breaker = make_breaker()
+    for _ in range(breaker.min_calls):
+        breaker.record_success(2.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_old_calls_leave_the_window(clock):
+    breaker = make_breaker()
+    for _ in range(breaker.min_calls - 1):
+        breaker.record_failure(0.1)
+    clock.now += 61
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_successful_probe_closes(clock):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()["window_calls"] == 0
+
+
+@pytest.mark.parametrize("latency, failed", [(0.1, True), (2.0, False)])
+def test_failed_or_slow_probe_reopens(clock, latency, failed):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(latency, failed=failed)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.snapshot()["counters"]["opened"] == 2
+
+
+def test_release_frees_probe_slot(clock):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
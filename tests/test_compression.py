@@ -0,0 +1,40 @@
+import pytest
+from app import compression
+from app.compression import _choose_encoding, _with_vary
+
+
+def scope(accept):
+    return {"headers": [(b"accept-encoding", accept)]} if accept is not None else {"headers": []}
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    (b"identity", None),
+    (b"gzip", "gzip"),
+    (b"br, gzip", "br"),
+    (b"gzip;q=1.0, br;q=0.5", "gzip"),
+    (b"br;q=0, gzip", "gzip"),
+    (b"gzip;q=0", None),
+    (b"*", "br"),
+    (b"*;q=0.5, br;q=0", "gzip"),
+    (b"gzip;q=abc", None),
+])
+def test_choose_encoding(monkeypatch, accept, expected):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert _choose_encoding(scope(accept)) == expected
+
+
+def test_choose_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert _choose_encoding(scope(b"br, gzip;q=0.1")) == "gzip"
+    assert _choose_encoding(scope(b"br")) is None
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ([], [(b"vary", b"Accept-Encoding")]),
+    ([(b"vary", b"Origin")], [(b"vary", b"Origin, Accept-Encoding")]),
+    ([(b"Vary", b"origin, accept-encoding")], [(b"Vary", b"origin, accept-encoding")]),
+    ([(b"vary", b"*")], [(b"vary", b"*")]),
+])
+def test_with_vary(headers, expected):
+    assert _with_vary(headers) == expected
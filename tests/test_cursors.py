@@ -0,0 +1,40 @@
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from app.routers import search_router
+from app.services import roster_service
+
+
+def test_roster_cursor_round_trip():
+    oid = ObjectId()
+    cursor = roster_service._encode_cursor({"_id": oid, "username": "Alice", "username_lower": "alice"})
+    assert roster_service._decode_cursor(cursor) == ("alice", oid)
+
+
+def test_roster_cursor_keeps_separator_in_name():
+    oid = ObjectId()
+    cursor = roster_service._encode_cursor({"_id": oid, "username": "a|b", "username_lower": "a|b"})
+    assert roster_service._decode_cursor(cursor) == ("a|b", oid)
+
+
+def test_roster_cursor_for_user_without_search_fields():
+    # Users written before username_lower existed
+    oid = ObjectId()
+    cursor = roster_service._encode_cursor({"_id": oid, "username": "Legacy"})
+    assert roster_service._decode_cursor(cursor) == ("legacy", oid)
+
+
+def test_search_cursor_round_trip():
+    oid = ObjectId()
+    when = datetime(2025, 3, 4, 5, 6, 7, 890000)
+    cursor = search_router._encode_cursor({"_id": oid, "consultation_date": when})
+    assert search_router._decode_cursor(cursor) == (when, oid)
+
+
+@pytest.mark.parametrize("decode", [roster_service._decode_cursor, search_router._decode_cursor])
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90aGluZw==", ""])
+def test_invalid_cursor_is_400(decode, cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode(cursor)
+    assert exc.value.status_code == 400
@@ -0,0 +1,87 @@
+import copy
+import json
+import pytest
+from app.services.disease_catalog import (
+    CATALOG_PATH, CatalogVersionError, DiseaseCatalog, fingerprint_names, format_probability,
+)
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    c = DiseaseCatalog()
+    c.load()
+    return c
+
+
+@pytest.fixture
+def registry():
+    with open(CATALOG_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def full_entry(catalog, disease, p):
+    description, precautions = catalog.describe(disease)
+    return {"disease": disease, "probability": format_probability(p), "description": description, "precautions": precautions}
+
+
+def test_every_disease_round_trips(catalog):
+    payload = {"predictions": [full_entry(catalog, name, 0.1234) for name in catalog._names]}
+    compact = catalog.compact(payload)
+    assert compact["catalog"] == catalog.version
+    assert all(set(entry) == {"id", "p"} for entry in compact["predictions"])
+    assert catalog.hydrate(compact) == payload
+
+
+def test_compact_keeps_entries_it_cannot_shorten(catalog):
+    llm = {"disease": "Something new", "probability": "40%", "description": "From the LLM"}
+    edited = {**full_entry(catalog, "Migraine", 0.5), "description": "Edited by hand"}
+    odd_probability = {**full_entry(catalog, "Migraine", 0.5), "probability": "about half"}
+    payload = {"predictions": [llm, edited, odd_probability]}
+    assert catalog.compact(payload) is payload
+    assert catalog.hydrate(payload) is payload
+
+
+def test_compact_is_idempotent(catalog):
+    compact = catalog.compact({"predictions": [full_entry(catalog, "Migraine", 0.25)]})
+    assert catalog.compact(compact) is compact
+
+
+def test_hydrate_rejects_unknown_version(catalog):
+    with pytest.raises(CatalogVersionError):
+        catalog.hydrate({"catalog": catalog.version + 1, "predictions": [{"id": 0, "p": 0.5}]})
+
+
+def test_hydrate_rejects_id_outside_version(catalog):
+    with pytest.raises(CatalogVersionError):
+        catalog.hydrate({"catalog": catalog.version, "predictions": [{"id": len(catalog._names), "p": 0.5}]})
+
+
+def test_load_rejects_reordered_catalog(tmp_path, registry):
+    registry["diseases"][0], registry["diseases"][1] = registry["diseases"][1], registry["diseases"][0]
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(registry))
+    with pytest.raises(CatalogVersionError):
+        DiseaseCatalog().load(str(path))
+
+
+def test_load_requires_entry_for_current_version(tmp_path, registry):
+    registry["diseases"].append("New disease")
+    registry["version"] += 1
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(registry))
+    with pytest.raises(CatalogVersionError):
+        DiseaseCatalog().load(str(path))
+
+
+def test_appended_version_still_hydrates_old_documents(tmp_path, catalog, registry):
+    old = catalog.compact({"predictions": [full_entry(catalog, "Migraine", 0.3)]})
+    newer = copy.deepcopy(registry)
+    newer["diseases"].append("New disease")
+    newer["version"] += 1
+    newer["versions"].append({"version": newer["version"], "size": len(newer["diseases"]),
+                              "sha256": fingerprint_names(newer["diseases"])})
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(newer))
+    upgraded = DiseaseCatalog()
+    upgraded.load(str(path))
+    assert upgraded.hydrate(old) == catalog.hydrate(old)
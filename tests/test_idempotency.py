@@ -0,0 +1,81 @@
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException
+from app.services import idempotency_service
+from app.services.idempotency_service import request_fingerprint, run_once
+from conftest import run
+
+
+def counting_handler(response):
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return response
+    return handler, calls
+
+
+def test_fingerprint_separates_parts():
+    assert request_fingerprint("ab", b"c") != request_fingerprint("a", b"bc")
+    assert request_fingerprint("x", None) != request_fingerprint(None, b"x")
+    assert request_fingerprint("x", None) == request_fingerprint("x", None)
+
+
+def test_repeat_replays_stored_response(mongo_db):
+    handler, calls = counting_handler({"answer": 42})
+    fingerprint = request_fingerprint("text", None)
+    assert run(run_once("u", "k", fingerprint, handler)) == ({"answer": 42}, False)
+    assert run(run_once("u", "k", fingerprint, handler)) == ({"answer": 42}, True)
+    assert len(calls) == 1
+
+
+def test_keys_are_per_user(mongo_db):
+    handler, calls = counting_handler({"answer": 42})
+    run(run_once("u1", "k", "h", handler))
+    run(run_once("u2", "k", "h", handler))
+    assert len(calls) == 2
+
+
+def test_reused_key_with_other_request_is_422(mongo_db):
+    handler, calls = counting_handler({"answer": 42})
+    run(run_once("u", "k", request_fingerprint("first", None), handler))
+    with pytest.raises(HTTPException) as exc:
+        run(run_once("u", "k", request_fingerprint("second", None), handler))
+    assert exc.value.status_code == 422
+    assert len(calls) == 1
+
+
+def test_failed_handler_releases_key(mongo_db):
+    async def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        run(run_once("u", "k", "h", failing))
+    handler, calls = counting_handler({"answer": 1})
+    assert run(run_once("u", "k", "h", handler)) == ({"answer": 1}, False)
+
+
+def _insert_in_progress(mongo_db, lease_offset, request_hash="h"):
+    now = idempotency_service._now()
+    run(idempotency_service._collection().insert_one({
+        "user": "u", "key": "k", "status": "in_progress", "token": "dead-worker", "request_hash": request_hash,
+        "response": None, "created_at": now, "lease_until": now + lease_offset, "expires_at": now + timedelta(hours=1),
+    }))
+
+
+def test_stale_lease_is_taken_over(mongo_db):
+    _insert_in_progress(mongo_db, timedelta(seconds=-1))
+    handler, calls = counting_handler({"answer": 7})
+    assert run(run_once("u", "k", "h", handler)) == ({"answer": 7}, False)
+    assert run(run_once("u", "k", "h", handler)) == ({"answer": 7}, True)
+    assert len(calls) == 1
+
+
+def test_live_lease_times_out_with_409(mongo_db, monkeypatch):
+    monkeypatch.setattr(idempotency_service.settings, "IDEMPOTENCY_WAIT_SECONDS", 0.1)
+    _insert_in_progress(mongo_db, timedelta(minutes=5))
+    handler, calls = counting_handler({"answer": 7})
+    with pytest.raises(HTTPException) as exc:
+        run(run_once("u", "k", "h", handler))
+    assert exc.value.status_code == 409
+    assert not calls
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from app import admission
+from app.admission import AdmissionControlMiddleware
+from app.services import rate_limiter
+from app.services.rate_limiter import InMemoryBackend, RateLimitBackend, parse_rate
+from conftest import run
+
+
+def test_parse_rate():
+    assert parse_rate("10/minute") == (10 / 60, 10.0)
+    assert parse_rate("5/second") == (5.0, 5.0)
+    assert parse_rate("3/30") == (0.1, 3.0)
+
+
+def test_backend_must_implement_take():
+    class Incomplete(RateLimitBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_token_bucket_bursts_then_refills(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    backend = InMemoryBackend()
+
+    async def take():
+        return await backend.take("k", rate=1.0, burst=3.0)
+
+    assert [run(take())[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = run(take())
+    assert not allowed and retry_after == pytest.approx(1.0)
+    now[0] += 1.0
+    assert run(take())[0]
+    now[0] += 100.0
+    assert [run(take())[0] for _ in range(4)] == [True, True, True, False]
+
+
+def test_buckets_are_per_key(monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: 0.0)
+    backend = InMemoryBackend()
+    assert run(backend.take("a", 1.0, 1.0))[0]
+    assert not run(backend.take("a", 1.0, 1.0))[0]
+    assert run(backend.take("b", 1.0, 1.0))[0]
+
+
+def test_over_capacity_does_not_spend_tokens(monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: 0.0)
+    monkeypatch.setattr(admission.settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(admission.settings, "MAX_CONCURRENT_ANALYSES", 1)
+    monkeypatch.setattr(admission.settings, "RATE_LIMIT_RULES", {"POST /api/analyze": {"user": "2/minute"}})
+    monkeypatch.setattr(rate_limiter, "_backend", InMemoryBackend())
+
+    async def scenario():
+        release = asyncio.Event()
+        entered = asyncio.Event()
+
+        async def app(scope, receive, send):
+            if scope["path"] == "/api/analyze" and not entered.is_set():
+                entered.set()
+                await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        middleware = AdmissionControlMiddleware(app)
+
+        async def call():
+            statuses = []
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+            scope = {"type": "http", "method": "POST", "path": "/api/analyze", "headers": [], "client": ("1.2.3.4", 1)}
+            await middleware(scope, None, send)
+            return statuses[0]
+
+        first = asyncio.create_task(call())
+        await entered.wait()
+        busy = [await call() for _ in range(3)]
+        release.set()
+        return await first, busy, await call(), await call()
+
+    first, busy, second, third = run(scenario())
+    assert first == 200
+    assert busy == [503, 503, 503]
+    # Two tokens per minute: the 503s above must not have used the second one
+    assert second == 200
+    assert third == 429